@@ -1,26 +1,161 @@
+"""
+app.py
+Starts the FastAPI backend, waits until its /health endpoint answers, then
+starts the Chainlit frontend. Both children are supervised: SIGTERM/SIGINT
+are forwarded to them, and a child that crashes is restarted (up to
+MAX_RESTARTS times per RESTART_WINDOW seconds).
+
+Commands and working directories can be overridden with BACKEND_CMD,
+BACKEND_CWD, FRONTEND_CMD and FRONTEND_CWD (the Dockerfile does this).
+"""
+
+import os
+import shlex
+import signal
 import subprocess
 import sys
 import time
-import os
+import urllib.error
+import urllib.request
+
+BACKEND_CMD = os.getenv("BACKEND_CMD") or (
+    f"{sys.executable} -m uvicorn fastapi_backend.src.fastapi_backend.main:app --host 0.0.0.0 --port 8000"
+)
+FRONTEND_CMD = os.getenv("FRONTEND_CMD") or (
+    f"{sys.executable} -m chainlit run chainlit_frontend/app.py --host 0.0.0.0 --port 7860 --headless"
+)
+BACKEND_CWD = os.getenv("BACKEND_CWD") or None
+FRONTEND_CWD = os.getenv("FRONTEND_CWD") or None
+HEALTH_URL = os.getenv("HEALTH_URL", "http://127.0.0.1:8000/health")
+READY_TIMEOUT = float(os.getenv("READY_TIMEOUT", "120"))   # seconds to wait for the backend
+MAX_RESTARTS = int(os.getenv("MAX_RESTARTS", "5"))
+RESTART_WINDOW = float(os.getenv("RESTART_WINDOW", "300"))
+STOP_TIMEOUT = float(os.getenv("STOP_TIMEOUT", "10"))      # grace period before SIGKILL
+
+stopping = False  # set by SIGTERM/SIGINT
+
+
+class Child:
+    """One supervised subprocess."""
+    def __init__(self, name: str, command: str, cwd: str | None):
+        self.name = name
+        self.command = shlex.split(command)
+        self.cwd = cwd
+        self.process: subprocess.Popen | None = None
+        self.restarts: list[float] = []
+
+    def start(self):
+        print(f"[supervisor] starting {self.name}: {shlex.join(self.command)}", flush=True)
+        self.process = subprocess.Popen(self.command, cwd=self.cwd)
+
+    def exited(self) -> int | None:
+        """The exit code if the child has stopped, otherwise None."""
+        return self.process.poll() if self.process else None
+
+    def may_restart(self) -> bool:
+        """Records a restart, unless the child has crashed too often recently."""
+        now = time.monotonic()
+        self.restarts = [t for t in self.restarts if now - t < RESTART_WINDOW]
+        if len(self.restarts) >= MAX_RESTARTS:
+            return False
+        self.restarts.append(now)
+        return True
+
+    def signal(self, signum: int):
+        if self.process and self.process.poll() is None:
+            self.process.send_signal(signum)
+
+    def stop(self, deadline: float):
+        """Waits for the child to exit until `deadline`, then kills it."""
+        if not self.process:
+            return
+        try:
+            self.process.wait(timeout=max(0.0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            print(f"[supervisor] {self.name} did not stop in time, killing it", flush=True)
+            self.process.kill()
+            self.process.wait()
+
+
+def backend_ready() -> bool:
+    try:
+        with urllib.request.urlopen(HEALTH_URL, timeout=2) as response:
+            return response.status == 200
+    except (urllib.error.URLError, OSError):
+        return False
+
+
+def wait_until_ready(backend: Child) -> bool:
+    """Polls HEALTH_URL with exponential backoff (0.1s up to 2s) until it answers."""
+    deadline = time.monotonic() + READY_TIMEOUT
+    delay = 0.1
+    while time.monotonic() < deadline and not stopping:
+        if backend.exited() is not None:
+            return False
+        if backend_ready():
+            return True
+        time.sleep(delay)
+        delay = min(delay * 2, 2.0)
+    return False
+
+
+def request_stop(signum, frame):
+    global stopping
+    stopping = True
+    for child in children:
+        child.signal(signum)
+
+
+def shutdown() -> None:
+    for child in children:
+        child.signal(signal.SIGTERM)
+    deadline = time.monotonic() + STOP_TIMEOUT
+    for child in children:
+        child.stop(deadline)
+
+
+backend = Child("backend", BACKEND_CMD, BACKEND_CWD)
+frontend = Child("frontend", FRONTEND_CMD, FRONTEND_CWD)
+children = [backend, frontend]
+
+
+def main() -> int:
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    backend.start()
+    started = time.monotonic()
+    while not wait_until_ready(backend):
+        if stopping:
+            shutdown()
+            return 0
+        if backend.exited() is None:
+            print(f"[supervisor] backend not ready after {READY_TIMEOUT:.0f}s", flush=True)
+            shutdown()
+            return 1
+        if not backend.may_restart():
+            print("[supervisor] backend keeps failing to start, giving up", flush=True)
+            return 1
+        backend.start()
+    print(f"[supervisor] backend ready after {time.monotonic() - started:.1f}s", flush=True)
+
+    frontend.start()
+    while not stopping:
+        time.sleep(0.5)
+        for child in children:
+            code = child.exited()
+            if code is None or stopping:
+                continue
+            print(f"[supervisor] {child.name} exited with code {code}", flush=True)
+            if not child.may_restart():
+                print(f"[supervisor] {child.name} restarted too often, shutting down", flush=True)
+                shutdown()
+                return 1
+            child.start()
+
+    shutdown()
+    return 0
+
 
-# 1. Start FastAPI Backend in the background
-print("Starting FastAPI backend on port 8000...")
-backend_process = subprocess.Popen([
-    sys.executable, "-m", "uvicorn", 
-    "fastapi_backend.src.fastapi_backend.main:app", 
-    "--host", "0.0.0.0", 
-    "--port", "8000"
-])
-
-# Give the backend a few seconds to initialize
-time.sleep(5)
-
-# 2. Start Chainlit Frontend on HF's required port 7860
-print("Starting Chainlit frontend on port 7860...")
-subprocess.run([
-    sys.executable, "-m", "chainlit", "run",
-    "chainlit_frontend/app.py",
-    "--host", "0.0.0.0",
-    "--port", "7860",
-    "--headless"
-])
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,16 @@
-from collections import defaultdict
+import json
 import sys
 import os
+from contextlib import asynccontextmanager
 
 # Add the correct path
 # sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'chainlit_frontend', 'src'))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from chainlit_frontend.booking_flow import BookingFlow
-from chainlit_frontend.salon_data import services
+from chainlit_frontend.catalogue import catalogue
+from chainlit_frontend.http_client import AGENT_TIMEOUT, close_client, get_client
+from chainlit_frontend.state_store import create_state_store
 import chainlit as cl
 import httpx
 
@@ -18,8 +21,22 @@ if not os.getenv("CHAINLIT_DB_URL"):
     print("Chainlit stateless mode: CHAINLIT_DB_URL is NOT set. Persistence disabled.")
 
 
-# Global booking flow instance (1 per session)
-booking_flow = BookingFlow()
+# Booking progress per Chainlit session (memory by default, Redis when configured)
+booking_states = create_state_store()
+
+
+@asynccontextmanager
+async def session_booking_flow():
+    """BookingFlow for the current Chainlit session; its state is saved on exit."""
+    session_id = cl.user_session.get("id")
+    state = await booking_states.get(session_id)
+    before = dict(state)
+    flow = BookingFlow(state)
+    try:
+        yield flow
+    finally:
+        if flow.state != before:
+            await booking_states.set(session_id, flow.state)
 
 
 API_BASE = os.getenv("API_BASE", "http://localhost:8000")
@@ -28,6 +45,15 @@ print(f"API_BASE loaded as: {API_BASE}")
 
 # API_BASE = "https://asuno-salon-chatbot.onrender.com"
 
+@cl.on_app_startup
+async def on_app_startup():
+    # Open the shared, pooled backend client once for the whole app
+    get_client()
+
+@cl.on_app_shutdown
+async def on_app_shutdown():
+    await close_client()
+
 @cl.on_chat_start
 async def on_chat_start():
     # Session ID is implicitly managed by the user's connection.
@@ -58,6 +84,18 @@ async def send_followup_buttons(content: str):
     ).send()
 
 
+async def read_sse(response: httpx.Response):
+    """Yield (event, data) pairs from a Server-Sent Events response."""
+    event = "message"
+    async for line in response.aiter_lines():
+        if line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            yield event, json.loads(line[len("data:"):])
+        elif not line:
+            event = "message"
+
+
 @cl.on_message
 async def on_message(message: cl.Message):
     session_id = cl.user_session.get("id")
@@ -65,12 +103,13 @@ async def on_message(message: cl.Message):
     lower_input = user_input.lower()
 
     # If user is in middle of booking (expecting a date or name)
-    if "service" in booking_flow.state and "date" not in booking_flow.state:
-        await booking_flow.provide_date(user_input)
-        return
-    elif "time" in booking_flow.state and "name" not in booking_flow.state:
-        await booking_flow.finalize(user_input)
-        return
+    async with session_booking_flow() as booking_flow:
+        if "service" in booking_flow.state and "date" not in booking_flow.state:
+            await booking_flow.provide_date(user_input)
+            return
+        elif "time" in booking_flow.state and "name" not in booking_flow.state:
+            await booking_flow.finalize(user_input)
+            return
 
     # Special case: user greets Aria
     if lower_input in ["hi", "hello", "hey"]:
@@ -85,17 +124,25 @@ async def on_message(message: cl.Message):
         await send_followup_buttons("✨ What would you like to do next?")
         return
 
-    # Otherwise → forward to marketing agent Aria via API
+    # Otherwise → forward to marketing agent Aria via API, rendering tokens as they arrive
+    reply = cl.Message(content="")
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{API_BASE}/agent/run",
-                json={"user_input": user_input, "session_id": session_id},
-                timeout=60, # Extend timeout for potentially long-running agent
-            )
+        async with get_client().stream(
+            "POST",
+            f"{API_BASE}/agent/run/stream",
+            json={"user_input": user_input, "session_id": session_id},
+            timeout=AGENT_TIMEOUT,
+        ) as response:
             response.raise_for_status() # Raise an exception for bad status codes
-            agent_response = response.json()
-            await cl.Message(content=agent_response.get("response", "Sorry, something went wrong.")).send()
+            async for event, data in read_sse(response):
+                if event == "error":
+                    reply.content = data.get("error", "Sorry, something went wrong.")
+                elif event == "done":
+                    if not reply.content:
+                        reply.content = data.get("response") or "Sorry, something went wrong."
+                else:
+                    await reply.stream_token(data.get("delta", ""))
+        await reply.send()
 
     except httpx.HTTPStatusError as e:
         await cl.Message(content=f"Sorry, the service is temporarily unavailable. Please try again later. (Error: {e.response.status_code})").send()
@@ -115,22 +162,7 @@ def with_aria_footer(content: str) -> str:
 @cl.action_callback("explore")
 async def explore_action(action: cl.Action):
     """Instantly show all salon services with professional formatting."""
-    # Group services by category
-    grouped = defaultdict(list)
-    for s in services:
-        grouped[s["category"]].append(s)
-
-    # Build formatted output
-    parts = []
-    for category, items in grouped.items():
-        parts.append(f"💎 {category} 💎\n" + "─" * 25)
-        for item in items:
-            parts.append(
-                f"• {item['name']} — {item['price']} ({item['description']})"
-            )
-        parts.append("")  # blank line after each category
-
-    services_text = "\n".join(parts).strip()
+    services_text = catalogue.listing_all.strip()
     services_text += (
         "\nTo schedule your visit, please click the 📅 **Book Appointment** button below."
     )
@@ -143,7 +175,8 @@ async def explore_action(action: cl.Action):
 @cl.action_callback("book")
 async def book_action(action: cl.Action):
     """Trigger deterministic booking flow"""
-    await booking_flow.start()
+    async with session_booking_flow() as booking_flow:
+        await booking_flow.start()
 
 @cl.action_callback("hours")
 async def hours_action(action: cl.Action):
@@ -159,28 +192,32 @@ async def hours_action(action: cl.Action):
 @cl.action_callback("bf_select_category")
 async def bf_select_category(action: cl.Action):
     category = action.payload.get("category")
-    await booking_flow.select_category(category)
+    async with session_booking_flow() as booking_flow:
+        await booking_flow.select_category(category)
 
 
 @cl.action_callback("bf_select_service")
 async def bf_select_service(action: cl.Action):
     service = action.payload.get("service")
-    await booking_flow.select_service(service)
+    async with session_booking_flow() as booking_flow:
+        await booking_flow.select_service(service)
 
 
 @cl.action_callback("bf_select_time")
 async def bf_select_time(action: cl.Action):
     time = action.payload.get("time")
-    await booking_flow.select_time(time)
+    async with session_booking_flow() as booking_flow:
+        await booking_flow.select_time(time)
 
 @cl.action_callback("bf_select_date")
 async def bf_select_date(action: cl.Action):
     date = action.payload.get("date")
-    await booking_flow.provide_date(date)
+    async with session_booking_flow() as booking_flow:
+        await booking_flow.provide_date(date)
 
 @cl.action_callback("exit_booking")
 async def exit_booking(action: cl.Action):
-    booking_flow.state.clear()
+    await booking_states.delete(cl.user_session.get("id"))
     await cl.Message(
         content="❌ Booking flow cancelled. You're back with Aria.",
         actions=[
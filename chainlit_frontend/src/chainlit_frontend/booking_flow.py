@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta
-from chainlit_frontend.salon_data import services
+from chainlit_frontend.catalogue import catalogue
+from chainlit_frontend.http_client import BOOKING_TIMEOUT, get_client
 import chainlit as cl, httpx
 
 # API_BASE = "http://localhost:8001"  # ⬅️ replace with prod URL when deployed
@@ -9,11 +10,12 @@ class BookingFlow:
     """
     Deterministic booking flow for Asuna Salon.
     Delegates persistence to backend API.
+    Works on one session's state dict; loading and saving it is the caller's job.
     """
 
-    def __init__(self):
-        self.state = {}
-        self.categories = sorted(set(s["category"] for s in services))
+    def __init__(self, state: dict | None = None):
+        self.state = state if state is not None else {}
+        self.categories = catalogue.categories
 
     async def start(self):
         """Step 1: Show categories"""
@@ -33,7 +35,7 @@ class BookingFlow:
     async def select_category(self, category: str):
         """Step 2: Show services in chosen category"""
         self.state["category"] = category
-        filtered = [s for s in services if s["category"] == category]
+        filtered = catalogue.by_category.get(category, ())
 
         await cl.Message(
             content=(
@@ -45,8 +47,8 @@ class BookingFlow:
                 *[
                     cl.Action(
                         name="bf_select_service",
-                        label=f"{s['name']} — {s['price']} ({s['description']})",
-                        payload={"service": s["name"]},
+                        label=s.label,
+                        payload={"service": s.name},
                     )
                     for s in filtered
                 ],
@@ -61,18 +63,25 @@ class BookingFlow:
     async def select_service(self, service: str):
         """Step 3: Confirm service and show date options"""
         self.state["service"] = service
-        chosen = next(s for s in services if s["name"] == service)
+        chosen = catalogue.get(service)
 
         today = datetime.today()
-        date_options = [
-            (today + timedelta(days=i)).strftime("%Y-%m-%d")
-            for i in range(1, 8)
-        ]
+        date_options = await self.bookable_dates(service, today + timedelta(days=1))
+        if date_options is None:
+            # Availability unknown: offer the next week as before
+            date_options = [
+                (today + timedelta(days=i)).strftime("%Y-%m-%d")
+                for i in range(1, 8)
+            ]
+            note = ""
+        else:
+            note = "_Days we're closed or fully booked are not shown._\n"
 
         await cl.Message(
             content=(
-                f"✅ {chosen['name']} selected\n"
-                f"💰 {chosen['price']}   ⏱ {chosen['description']}\n\n"
+                f"✅ {chosen.name} selected\n"
+                f"💰 {chosen.price}   ⏱ {chosen.description}\n\n"
+                f"{note}"
                 "📅 Please select your preferred date:"
             ),
             actions=[
@@ -92,6 +101,33 @@ class BookingFlow:
             ],
         ).send()
 
+    async def bookable_dates(self, service: str, start: datetime, days: int = 14, show: int = 7):
+        """
+        First `show` dates with a free slot in the `days` from start, from one
+        /bookings/availability call. None if the backend can't say.
+        """
+        end = start + timedelta(days=days - 1)
+        try:
+            resp = await get_client().get(
+                f"{API_BASE}/bookings/availability",
+                params={
+                    "service": service,
+                    "from": start.strftime("%Y-%m-%d"),
+                    "to": end.strftime("%Y-%m-%d"),
+                },
+                timeout=BOOKING_TIMEOUT,
+            )
+            resp.raise_for_status()
+            days_info = resp.json()["days"]
+        except (httpx.HTTPError, ValueError, KeyError, TypeError):
+            return None
+
+        # A day is bookable if any bit of its slot bitmap is set
+        return [
+            d["date"] for d in days_info
+            if d.get("bitmap") and int(d["bitmap"], 16)
+        ][:show]
+
     async def provide_date(self, date: str):
         """Step 4: Fetch available slots from backend API"""
         service_name = self.state.get("service")
@@ -104,29 +140,29 @@ class BookingFlow:
             return
 
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                resp = await client.get(
-                    f"{API_BASE}/bookings/available-times/{date}",
-                    params={"service": service_name},
-                )
-                resp.raise_for_status()
-
-                # Defensive JSON parsing
-                content_type = resp.headers.get("content-type", "")
-                if "application/json" not in content_type.lower():
-                    # Unexpected content type, avoid JSONDecodeError
-                    await cl.Message(
-                        content="⚠️ Unexpected response from booking server. Please try again later."
-                    ).send()
-                    return
-
-                try:
-                    result = resp.json()
-                except ValueError:
-                    await cl.Message(
-                        content="⚠️ Booking server returned invalid data. Please try again later."
-                    ).send()
-                    return
+            resp = await get_client().get(
+                f"{API_BASE}/bookings/available-times/{date}",
+                params={"service": service_name},
+                timeout=BOOKING_TIMEOUT,
+            )
+            resp.raise_for_status()
+
+            # Defensive JSON parsing
+            content_type = resp.headers.get("content-type", "")
+            if "application/json" not in content_type.lower():
+                # Unexpected content type, avoid JSONDecodeError
+                await cl.Message(
+                    content="⚠️ Unexpected response from booking server. Please try again later."
+                ).send()
+                return
+
+            try:
+                result = resp.json()
+            except ValueError:
+                await cl.Message(
+                    content="⚠️ Booking server returned invalid data. Please try again later."
+                ).send()
+                return
 
         except httpx.RequestError:
             await cl.Message(
@@ -234,33 +270,46 @@ class BookingFlow:
         }
 
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                resp = await client.post(f"{API_BASE}/bookings", json=booking_data)
-                resp.raise_for_status()
-
-                # Defensive JSON parsing
-                content_type = resp.headers.get("content-type", "")
-                if "application/json" not in content_type.lower():
-                    await cl.Message(
-                        content="⚠️ Booking server returned unexpected response. Please contact support."
-                    ).send()
-                    self.state.clear()
-                    return
-
-                try:
-                    result = resp.json()
-                except ValueError:
-                    await cl.Message(
-                        content="⚠️ Booking server returned invalid data. Please contact support."
-                    ).send()
-                    self.state.clear()
-                    return
+            resp = await get_client().post(
+                f"{API_BASE}/bookings",
+                json=booking_data,
+                timeout=BOOKING_TIMEOUT,
+            )
+            resp.raise_for_status()
+
+            # Defensive JSON parsing
+            content_type = resp.headers.get("content-type", "")
+            if "application/json" not in content_type.lower():
+                await cl.Message(
+                    content="⚠️ Booking server returned unexpected response. Please contact support."
+                ).send()
+                self.state.clear()
+                return
+
+            try:
+                result = resp.json()
+            except ValueError:
+                await cl.Message(
+                    content="⚠️ Booking server returned invalid data. Please contact support."
+                ).send()
+                self.state.clear()
+                return
         except httpx.RequestError:
             await cl.Message(
                 content="⚠️ Could not reach the booking server. Please try again shortly."
             ).send()
             return
         except httpx.HTTPStatusError as e:
+            if e.response.status_code == 409:
+                # Slot taken in the meantime: go back to choosing a time that day
+                self.state.pop("time", None)
+                self.state.pop("name", None)
+                await cl.Message(
+                    content=f"⚠️ Sorry, {booking_data['time']} on {booking_data['date']} has just been booked. Please choose another time."
+                ).send()
+                await self.provide_date(booking_data["date"])
+                return
+
             body = ""
             try:
                 body = e.response.text
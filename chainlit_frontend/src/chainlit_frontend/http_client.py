@@ -0,0 +1,43 @@
+"""
+http_client.py
+One pooled httpx.AsyncClient shared by every Chainlit session, so requests to
+the backend reuse keep-alive (and HTTP/2 when `h2` is installed) connections
+instead of paying a new TCP/TLS handshake each time.
+"""
+
+import importlib.util
+import httpx
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Per-endpoint timeouts: the agent streams for a while, booking calls should be quick
+AGENT_TIMEOUT = httpx.Timeout(60.0, connect=5.0)   # read = max wait between streamed chunks
+BOOKING_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+
+LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=20,
+    keepalive_expiry=60.0,
+)
+
+shared_client: httpx.AsyncClient | None = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Returns the application-wide client, creating it on first use."""
+    global shared_client
+    if shared_client is None or shared_client.is_closed:
+        shared_client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=LIMITS,
+            timeout=BOOKING_TIMEOUT,
+        )
+    return shared_client
+
+
+async def close_client():
+    """Closes the shared client and its pooled connections."""
+    global shared_client
+    if shared_client is not None:
+        await shared_client.aclose()
+        shared_client = None
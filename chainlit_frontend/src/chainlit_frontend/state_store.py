@@ -0,0 +1,85 @@
+"""
+state_store.py
+Per-session BookingFlow state, serialised to JSON and kept in a pluggable
+backend with TTL expiry:
+- "memory" (default): in this process only.
+- "redis": any redis.asyncio-compatible client, so several frontend
+  processes can share bookings in progress.
+"""
+
+import json
+import os
+import time
+
+
+class InMemoryStateStore:
+    """Process-local store; expired entries are dropped on access and periodically."""
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self.entries: dict[str, tuple[float, str]] = {}
+        self.last_sweep = time.monotonic()
+
+    async def get(self, session_id: str) -> dict:
+        entry = self.entries.get(session_id)
+        if entry is None:
+            return {}
+        expires_at, payload = entry
+        if expires_at < time.monotonic():
+            del self.entries[session_id]
+            return {}
+        return json.loads(payload)
+
+    async def set(self, session_id: str, state: dict):
+        if not state:
+            await self.delete(session_id)
+            return
+        now = time.monotonic()
+        self.entries[session_id] = (now + self.ttl, json.dumps(state))
+        if now - self.last_sweep > self.ttl:
+            self.entries = {k: v for k, v in self.entries.items() if v[0] >= now}
+            self.last_sweep = now
+
+    async def delete(self, session_id: str):
+        self.entries.pop(session_id, None)
+
+
+class RedisStateStore:
+    """Store backed by a Redis-compatible async client (get / set(ex=) / delete)."""
+
+    def __init__(self, client, ttl: int, prefix: str = "asuna:booking:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def get(self, session_id: str) -> dict:
+        payload = await self.client.get(self.prefix + session_id)
+        return json.loads(payload) if payload else {}
+
+    async def set(self, session_id: str, state: dict):
+        if not state:
+            await self.delete(session_id)
+            return
+        await self.client.set(self.prefix + session_id, json.dumps(state), ex=self.ttl)
+
+    async def delete(self, session_id: str):
+        await self.client.delete(self.prefix + session_id)
+
+
+def create_state_store():
+    """
+    Builds the store selected by BOOKING_STATE_BACKEND ("memory" or "redis",
+    using REDIS_URL). Idle bookings expire after BOOKING_STATE_TTL seconds.
+    """
+    backend = os.getenv("BOOKING_STATE_BACKEND", "memory").lower()
+    ttl = int(os.getenv("BOOKING_STATE_TTL", "1800"))
+
+    if backend == "redis":
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("BOOKING_STATE_BACKEND=redis requires the 'redis' package") from e
+        client = redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"), decode_responses=True)
+        return RedisStateStore(client, ttl)
+
+    return InMemoryStateStore(ttl)
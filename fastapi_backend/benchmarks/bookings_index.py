@@ -0,0 +1,159 @@
+"""
+bookings_index.py
+Seeds a scratch copy of the bookings table with 1k .. 1M rows and times
+fetch_booked_intervals() (the availability query) over a 14-day window,
+with and without the (date, time) covering index.
+
+Everything happens in its own schema (--schema, dropped afterwards unless
+--keep), so it is safe to point at a dev database. Run from fastapi_backend/:
+
+    python benchmarks/bookings_index.py --sizes 1000,10000,100000,1000000
+
+Output of that command (default --repeat 200) on a local PostgreSQL 16.2,
+Python 3.13.0, 1 CPU:
+
+        1,000 rows | with index: p50    1.519 ms  p95    1.829 ms  (Index Only Scan)
+                   | without:    p50    1.910 ms  p95    2.149 ms  (Sort > Seq Scan)
+       10,000 rows | with index: p50    1.909 ms  p95    3.407 ms  (Index Only Scan)
+                   | without:    p50    2.809 ms  p95    3.117 ms  (Sort > Seq Scan)
+      100,000 rows | with index: p50    1.248 ms  p95    1.849 ms  (Index Only Scan)
+                   | without:    p50    8.965 ms  p95   13.002 ms  (Sort > Seq Scan)
+    1,000,000 rows | with index: p50    1.834 ms  p95    2.028 ms  (Index Only Scan)
+                   | without:    p50  115.913 ms  p95  135.176 ms  (Gather Merge > Sort > Seq Scan)
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import date, timedelta
+from sqlalchemy import MetaData, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from fastapi_backend.booking_store import fetch_booked_intervals
+from fastapi_backend.database import connection_string
+from fastapi_backend.models.booking_models import Booking
+
+SLOTS_PER_DAY = 16   # 09:00 .. 16:30 every 30 minutes
+FIRST_DAY = date(2000, 1, 1)
+WINDOW_DAYS = 14
+
+SEED = """
+    INSERT INTO bookings (id, service, date, time, duration_minutes, client_name, reference)
+    SELECT gen_random_uuid(), 'Head Spa',
+           DATE '2000-01-01' + (n / {slots}),
+           TIME '09:00' + make_interval(mins => (n % {slots}) * 30),
+           30, 'Bench Client', 'BENCH-' || n
+    FROM generate_series(:start, :stop - 1) AS n
+""".format(slots=SLOTS_PER_DAY)
+
+PLAN = """
+    EXPLAIN (FORMAT JSON)
+    SELECT date, time, duration_minutes FROM bookings
+    WHERE date BETWEEN :start AND :end ORDER BY date, time
+"""
+
+
+def plan_nodes(plan: dict) -> str:
+    """'Sort > Seq Scan' style summary of an EXPLAIN plan tree."""
+    nodes = [plan["Node Type"]]
+    while plan.get("Plans"):
+        plan = plan["Plans"][0]
+        nodes.append(plan["Node Type"])
+    return " > ".join(nodes)
+
+
+async def measure(engine, rows: int, repeat: int) -> dict:
+    # A window in the middle of the seeded range
+    middle = FIRST_DAY + timedelta(days=rows // SLOTS_PER_DAY // 2)
+    start, end = middle, middle + timedelta(days=WINDOW_DAYS - 1)
+
+    async with engine.connect() as conn:
+        plan = (await conn.execute(text(PLAN), {"start": start, "end": end})).scalar()
+    async with AsyncSession(engine) as db:
+        await fetch_booked_intervals(db, start, end)   # warm up
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            booked = await fetch_booked_intervals(db, start, end)
+            timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    return {
+        "rows": rows,
+        "plan": plan_nodes(plan[0]["Plan"]),
+        "bookings_returned": sum(len(v) for v in booked.values()),
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+    }
+
+
+async def run(sizes: list[int], repeat: int, schema: str, keep: bool) -> list[dict]:
+    engine = create_async_engine(
+        connection_string,
+        connect_args={"statement_cache_size": 0, "server_settings": {"search_path": schema}},
+    )
+    metadata = MetaData(schema=schema)
+    table = Booking.__table__.to_metadata(metadata)
+    index = next(i for i in table.indexes if i.name == "ix_bookings_date_time")
+
+    results = []
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text(f'DROP SCHEMA IF EXISTS "{schema}" CASCADE'))
+            await conn.execute(text(f'CREATE SCHEMA "{schema}"'))
+            await conn.run_sync(metadata.create_all)
+
+        seeded = 0
+        for rows in sorted(sizes):
+            async with engine.begin() as conn:
+                await conn.execute(text(SEED), {"start": seeded, "stop": rows})
+            seeded = rows
+            async with engine.connect() as conn:
+                autocommit = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                await autocommit.execute(text("VACUUM ANALYZE bookings"))
+
+            with_index = await measure(engine, rows, repeat)
+            async with engine.begin() as conn:
+                await conn.run_sync(lambda sync_conn: index.drop(sync_conn))
+                await conn.execute(text("ANALYZE bookings"))
+            without_index = await measure(engine, rows, repeat)
+            async with engine.begin() as conn:
+                await conn.run_sync(lambda sync_conn: index.create(sync_conn))
+
+            results.append({"with_index": with_index, "without_index": without_index})
+            print(
+                f"{rows:>9,} rows | with index: p50 {with_index['p50_ms']:8.3f} ms  p95 {with_index['p95_ms']:8.3f} ms"
+                f"  ({with_index['plan']})\n"
+                f"{'':>14} | without:    p50 {without_index['p50_ms']:8.3f} ms  p95 {without_index['p95_ms']:8.3f} ms"
+                f"  ({without_index['plan']})",
+                flush=True,
+            )
+    finally:
+        if not keep:
+            async with engine.begin() as conn:
+                await conn.execute(text(f'DROP SCHEMA IF EXISTS "{schema}" CASCADE'))
+        await engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000",
+                        help="comma-separated table sizes to measure")
+    parser.add_argument("--repeat", type=int, default=200, help="queries timed per size")
+    parser.add_argument("--schema", default="bench_bookings_index")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch schema afterwards")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = asyncio.run(run(sizes, args.repeat, args.schema, args.keep))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
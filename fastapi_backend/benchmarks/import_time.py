@@ -0,0 +1,69 @@
+"""
+import_time.py
+Measures how long `import fastapi_backend.main` takes in a fresh interpreter,
+and which top-level imports account for it (via `python -X importtime`).
+
+Run from fastapi_backend/ with the usual backend environment (.env or exported
+settings):
+
+    python benchmarks/import_time.py --runs 10 --top 15
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+
+def run_import(module: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(SRC_DIR), os.environ.get("PYTHONPATH")]))}
+    command = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", f"import {module}"]
+    return subprocess.run(command, env=env, capture_output=True, text=True, check=True)
+
+
+def wall_times(module: str, runs: int) -> list[float]:
+    """Seconds per cold import, including interpreter startup."""
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        run_import(module)
+        times.append(time.perf_counter() - started)
+    return times
+
+
+def slowest_imports(module: str, top: int) -> list[tuple[int, int, str]]:
+    """(self us, cumulative us, name) for the imports with the largest cumulative time."""
+    rows = []
+    for line in run_import(module, importtime=True).stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.strip()))
+    return sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="fastapi_backend.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    baseline = wall_times("sys", args.runs)
+    times = wall_times(args.module, args.runs)
+    print(f"import {args.module}: {len(times)} runs")
+    print(f"  wall   median {statistics.median(times) * 1000:8.1f} ms   min {min(times) * 1000:8.1f} ms")
+    print(f"  (bare interpreter startup median {statistics.median(baseline) * 1000:.1f} ms)")
+
+    print("\nslowest imports (-X importtime, cumulative, nested imports included):")
+    for self_us, cumulative_us, name in slowest_imports(args.module, args.top):
+        print(f"  {cumulative_us / 1000:8.1f} ms  (self {self_us / 1000:6.1f} ms)  {name}")
+
+
+if __name__ == "__main__":
+    main()
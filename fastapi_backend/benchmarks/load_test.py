@@ -0,0 +1,291 @@
+"""
+load_test.py
+Offline load test for the booking and agent endpoints. It drives the app in
+process through httpx's ASGITransport, against a scratch Postgres database,
+with the LLM replaced by benchmarks/stub_model.py. Each endpoint is run at
+increasing concurrency, and the script reports p50/p95/p99 latency,
+throughput and DB queries per request.
+
+The script applies migrations and writes to the database, so it never uses
+the app's DIRECT_URL: pass a local or scratch database with --database-url
+(or LOAD_TEST_DATABASE_URL), and it refuses to run without one. It only
+touches rows it creates: bookings for LOAD_TEST_CLIENT in 2099 and sessions
+named loadtest-*. Those rows are removed afterwards. Run from fastapi_backend/:
+
+    export LOAD_TEST_DATABASE_URL=postgresql://postgres@localhost/loadtest
+    python benchmarks/load_test.py                                 # print results
+    python benchmarks/load_test.py --save-baseline benchmarks/baseline.json
+    python benchmarks/load_test.py --compare benchmarks/baseline.json   # exit 1 on regression
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import os
+import platform
+import sys
+import time
+from collections import Counter
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Dict, Iterator, List, Tuple
+
+import httpx
+from sqlalchemy import event, text
+
+from stub_model import stub_config
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("LOAD_TEST_DATABASE_URL"),
+                        help="scratch Postgres to run against (default: $LOAD_TEST_DATABASE_URL)")
+    parser.add_argument("--levels", default="1,8,32", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="requests per booking endpoint and level")
+    parser.add_argument("--agent-requests", type=int, default=64, help="/agent/run requests per level")
+    parser.add_argument("--model-latency", type=float, default=0.05, help="seconds per stubbed model call")
+    parser.add_argument("--save-baseline", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON to check the results against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("this writes to the database: pass --database-url or set LOAD_TEST_DATABASE_URL")
+    return args
+
+
+# The app reads DIRECT_URL when it is imported, so point it at the load-test
+# database first, whatever the environment or .env says
+ARGS = parse_args()
+os.environ["DIRECT_URL"] = ARGS.database_url
+
+main = importlib.import_module("fastapi_backend.main")
+from fastapi_backend.agents.response_cache import response_cache
+from fastapi_backend.availability import calendar
+from fastapi_backend.database import async_engine
+from fastapi_backend.migrations import migrate
+from fastapi_backend.opening_hours import OPENING_HOURS
+from fastapi_backend.session_store import session_cache
+
+LOAD_TEST_CLIENT = "Load Test"
+SESSION_PREFIX = "loadtest-"
+FIRST_DAY = date(2099, 1, 1)
+BOOKED_SERVICE = "Restyle with blow-dry"   # 30 minutes, so every half-hour slot is distinct
+AVAILABILITY_SERVICE = "Head Spa"
+AVAILABILITY_DAYS = 28
+
+CLEANUP = [
+    text("DELETE FROM bookings WHERE client_name = :client"),
+    text("DELETE FROM booking_counters WHERE date >= :first_day"),
+    text("DELETE FROM session_items WHERE session_id LIKE :sessions"),
+    text("DELETE FROM session_summaries WHERE session_id LIKE :sessions"),
+]
+
+
+class QueryCounter:
+    """Counts SQL statements executed by the app's engine."""
+    def __init__(self):
+        self.count = 0
+        event.listen(async_engine.sync_engine, "before_cursor_execute", self.on_execute)
+
+    def on_execute(self, *args):
+        self.count += 1
+
+
+def open_slots() -> Iterator[Tuple[str, str]]:
+    """Distinct half-hour (date, time) slots inside opening hours, from FIRST_DAY on."""
+    day = FIRST_DAY
+    while True:
+        hours = OPENING_HOURS[day.weekday()]
+        if hours:
+            start_h, start_m = map(int, hours["start"].split(":"))
+            end_h, end_m = map(int, hours["end"].split(":"))
+            for minutes in range(start_h * 60 + start_m, end_h * 60 + end_m - 30 + 1, 30):
+                yield str(day), f"{minutes // 60:02d}:{minutes % 60:02d}"
+        day += timedelta(days=1)
+
+
+def response_body(response: httpx.Response) -> dict:
+    # The booking endpoints report some failures as 200 {"error": ...}
+    try:
+        body = response.json()
+    except ValueError:
+        return {}
+    return body if isinstance(body, dict) else {}
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_level(
+    send: Callable[[int, int], Awaitable[httpx.Response]], requests: int, concurrency: int, queries: QueryCounter
+) -> Dict:
+    """
+    Sends `requests` calls through `concurrency` workers and summarises them.
+    `send` gets the request index and the worker number.
+    """
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    errors = 0
+    next_index = iter(range(requests))
+
+    async def worker(number: int):
+        nonlocal errors
+        for i in next_index:
+            started = time.perf_counter()
+            response = await send(i, number)
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[response.status_code] += 1
+            if response.status_code >= 400 or "error" in response_body(response):
+                errors += 1
+
+    queries_before = queries.count
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(number) for number in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "throughput_rps": round(requests / elapsed, 1),
+        "queries_per_request": round((queries.count - queries_before) / requests, 2),
+    }
+
+
+def reset_caches():
+    """Every level starts cold, so levels are comparable."""
+    calendar.clear()
+    session_cache.clear()
+    response_cache.clear()
+
+
+async def run(levels: List[int], requests: int, agent_requests: int, model_latency: float) -> Dict[str, List[Dict]]:
+    main.config = stub_config(model_latency)
+    # Exercise the agent path, not the response cache
+    response_cache.answers.maxsize = 0
+    queries = QueryCounter()
+    slots = open_slots()
+    results: Dict[str, List[Dict]] = {"available_times": [], "create_booking": [], "agent_run": []}
+
+    # Unhandled errors come back as 500s and are counted, rather than ending the run
+    transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+    async with main.app.router.lifespan_context(main.app), httpx.AsyncClient(
+        transport=transport, base_url="http://loadtest", timeout=120
+    ) as client:
+        for concurrency in levels:
+            run_id = f"c{concurrency}"
+
+            def available_times(i: int, worker: int):
+                day = FIRST_DAY + timedelta(days=i % AVAILABILITY_DAYS)
+                return client.get(f"/bookings/available-times/{day}", params={"service": AVAILABILITY_SERVICE})
+
+            def create_booking(i: int, worker: int):
+                day, start = next(slots)
+                return client.post("/bookings", json={
+                    "service": BOOKED_SERVICE, "date": day, "time": start, "client_name": LOAD_TEST_CLIENT,
+                })
+
+            def agent_run(i: int, worker: int):
+                # One conversation per worker: turns of a session never overlap, as with a real client
+                return client.post("/agent/run", json={
+                    "user_input": "Which facial would you recommend for dry skin?",
+                    "session_id": f"{SESSION_PREFIX}{run_id}-{worker}",
+                })
+
+            for name, send, total in (
+                ("available_times", available_times, requests),
+                ("create_booking", create_booking, requests),
+                ("agent_run", agent_run, agent_requests),
+            ):
+                reset_caches()
+                level = await run_level(send, total, concurrency, queries)
+                results[name].append(level)
+                print(
+                    f"{name:<16} c={concurrency:<4} p50 {level['p50_ms']:8.2f}  p95 {level['p95_ms']:8.2f}"
+                    f"  p99 {level['p99_ms']:8.2f} ms  {level['throughput_rps']:8.1f} req/s"
+                    f"  {level['queries_per_request']:5.2f} q/req  errors {level['errors']}  {level['statuses']}",
+                    flush=True,
+                )
+    return results
+
+
+async def cleanup():
+    async with async_engine.begin() as conn:
+        for statement in CLEANUP:
+            await conn.execute(statement, {
+                "client": LOAD_TEST_CLIENT, "first_day": FIRST_DAY, "sessions": f"{SESSION_PREFIX}%",
+            })
+
+
+def compare(results: Dict[str, List[Dict]], baseline: Dict, tolerance: float) -> List[str]:
+    """Regressions in p95 latency or queries per request beyond `tolerance`."""
+    regressions = []
+    for name, levels in results.items():
+        previous = {level["concurrency"]: level for level in baseline["results"].get(name, [])}
+        for level in levels:
+            before = previous.get(level["concurrency"])
+            if before is None:
+                continue
+            for metric in ("p95_ms", "queries_per_request"):
+                if level[metric] > before[metric] * (1 + tolerance) and level[metric] - before[metric] > 0.01:
+                    regressions.append(
+                        f"{name} c={level['concurrency']} {metric}: {before[metric]} -> {level[metric]}"
+                    )
+            if level["errors"] > before["errors"]:
+                regressions.append(f"{name} c={level['concurrency']} errors: {before['errors']} -> {level['errors']}")
+    return regressions
+
+
+def main_cli():
+    args = ARGS
+    logging.getLogger("sqlalchemy.engine.Engine").disabled = True
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    levels = [int(level) for level in args.levels.split(",")]
+
+    async def go():
+        await migrate()
+        await cleanup()
+        try:
+            return await run(levels, args.requests, args.agent_requests, args.model_latency)
+        finally:
+            await cleanup()
+            await async_engine.dispose()
+
+    results = asyncio.run(go())
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "levels": levels,
+            "requests": args.requests,
+            "agent_requests": args.agent_requests,
+            "model_latency": args.model_latency,
+        },
+        "results": results,
+    }
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"baseline written to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("REGRESSIONS:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        print(f"no regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,56 @@
+"""
+stub_model.py
+An offline stand-in for the LLM provider: returns a fixed reply after a
+fixed delay, so agent endpoints can be benchmarked without network access.
+"""
+
+import asyncio
+import time
+from agents import Model, ModelResponse, RunConfig, Usage
+from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
+    ResponseCreatedEvent,
+    ResponseOutputMessage,
+    ResponseOutputText,
+    ResponseTextDeltaEvent,
+)
+
+STUB_REPLY = "Our Head Spa is £70.00 and takes 1 hr 50 mins. Would you like to book it?"
+
+
+class StubModel(Model):
+    def __init__(self, latency: float = 0.05, reply: str = STUB_REPLY):
+        self.latency = latency
+        self.reply = reply
+
+    def message(self) -> ResponseOutputMessage:
+        return ResponseOutputMessage(
+            id="stub", type="message", role="assistant", status="completed",
+            content=[ResponseOutputText(type="output_text", text=self.reply, annotations=[])],
+        )
+
+    async def get_response(self, *args, **kwargs) -> ModelResponse:
+        await asyncio.sleep(self.latency)
+        usage = Usage(requests=1, input_tokens=400, output_tokens=40, total_tokens=440)
+        return ModelResponse(output=[self.message()], usage=usage, response_id=None)
+
+    async def stream_response(self, *args, **kwargs):
+        response = Response(
+            id="stub", created_at=time.time(), model="stub", object="response", output=[],
+            tool_choice="auto", tools=[], parallel_tool_calls=False,
+        )
+        yield ResponseCreatedEvent(type="response.created", response=response, sequence_number=0)
+        words = self.reply.split(" ")
+        for i, word in enumerate(words):
+            await asyncio.sleep(self.latency / len(words))
+            yield ResponseTextDeltaEvent(
+                type="response.output_text.delta", item_id="stub", output_index=0, content_index=0,
+                delta=word + " ", logprobs=[], sequence_number=i + 1,
+            )
+        completed = response.model_copy(update={"output": [self.message()]})
+        yield ResponseCompletedEvent(type="response.completed", response=completed, sequence_number=len(words) + 1)
+
+
+def stub_config(latency: float = 0.05) -> RunConfig:
+    return RunConfig(model=StubModel(latency), tracing_disabled=True)
@@ -1,6 +1,9 @@
 from agents import AsyncOpenAI
 from agents import Agent, OpenAIChatCompletionsModel, RunConfig, set_tracing_disabled
+from openai import DefaultAsyncHttpxClient
 from dotenv import load_dotenv
+from .limiter import ConcurrencyLimiter
+import httpx
 import os
 
 load_dotenv()
@@ -9,9 +12,34 @@ BASE_URL= os.getenv("BASE_URL")
 MODEL_NAME= os.getenv("MODEL_NAME")
 API_KEY= os.getenv("API_KEY")
 
+# Provider concurrency / backpressure, for the whole server (gunicorn_conf splits them between workers)
+LLM_MAX_IN_FLIGHT= int(os.getenv("LLM_MAX_IN_FLIGHT", "8"))
+LLM_MAX_QUEUE= int(os.getenv("LLM_MAX_QUEUE", "32"))
+LLM_QUEUE_TIMEOUT= float(os.getenv("LLM_QUEUE_TIMEOUT", "10"))
+LLM_RETRY_AFTER= int(os.getenv("LLM_RETRY_AFTER", "5"))
+LLM_TIMEOUT= float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_MAX_RETRIES= int(os.getenv("LLM_MAX_RETRIES", "2"))
+
 client = AsyncOpenAI(
     api_key=API_KEY,
     base_url=BASE_URL,
+    max_retries=LLM_MAX_RETRIES,
+    # Pool sized to the in-flight cap so bursts reuse warm connections
+    http_client=DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=LLM_MAX_IN_FLIGHT * 2,
+            max_keepalive_connections=LLM_MAX_IN_FLIGHT,
+        ),
+        timeout=httpx.Timeout(LLM_TIMEOUT, connect=5.0),
+    ),
+)
+
+llm_limiter = ConcurrencyLimiter(
+    provider=BASE_URL or "openai",
+    max_in_flight=LLM_MAX_IN_FLIGHT,
+    max_queue=LLM_MAX_QUEUE,
+    queue_timeout=LLM_QUEUE_TIMEOUT,
+    retry_after=LLM_RETRY_AFTER,
 )
 
 set_tracing_disabled(disabled=True)
@@ -0,0 +1,121 @@
+"""
+fast_path.py
+Answers plain catalogue questions (price, duration, "what do you offer")
+straight from the precompiled catalogue, so they skip the LLM round trips entirely.
+Anything consultative, about booking policy, or ambiguous returns None and
+goes to Aria.
+"""
+
+import re
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional
+from fastapi_backend.catalogue import Service, catalogue
+
+PRICE_WORDS = ("how much", "price", "cost", "charge", "fee", "£")
+DURATION_WORDS = (
+    "how long", "duration", "take long", "takes long",
+    "how many minutes", "how many mins", "how many hours", "how many hrs",
+)
+LIST_ALL_PHRASES = (
+    "all services", "list services", "list your services", "what services",
+    "which services", "services do you offer", "services you offer",
+    "what do you offer", "price list", "menu",
+)
+# Questions asking for advice rather than a fact belong to Aria
+CONSULTATIVE_WORDS = (
+    "should", "recommend", "suit", "good for", "right for", "better",
+    "difference", "compare", " vs", "best", "advice", "help me",
+)
+# So do booking policy questions: "can I pay a fee to cancel?" is not a price lookup
+POLICY_WORDS = (" cancel", " refund", " deposit", " reschedul", " rebook", " no show")
+
+# Minimum similarity between part of the question and a service name
+MATCH_THRESHOLD = 0.8
+
+BOOKING_HINT = "To schedule your visit, just click the **📅 Book Appointment** button."
+
+
+def normalize(text: str) -> str:
+    """Lower-case and collapse everything except letters, digits, £ and & to spaces."""
+    return " ".join(re.sub(r"[^a-z0-9£&]+", " ", text.lower()).split())
+
+
+# normalised service name -> service, built once at import
+SERVICE_INDEX: Dict[str, Service] = {normalize(s.name): s for s in catalogue.services}
+MAX_NAME_WORDS = max(len(name.split()) for name in SERVICE_INDEX)
+
+# Distinctive single words ("dermabrasion", "bridal") that belong to exactly one service
+GENERIC_WORDS = {"clear"}
+word_owners: Dict[str, List[Service]] = {}
+for name, service in SERVICE_INDEX.items():
+    for word in set(name.split()):
+        if len(word) >= 5 and word not in GENERIC_WORDS:
+            word_owners.setdefault(word, []).append(service)
+ALIAS_INDEX: Dict[str, Service] = {
+    **{word: owners[0] for word, owners in word_owners.items() if len(owners) == 1},
+    **SERVICE_INDEX,
+}
+
+
+def find_services(text: str) -> List[Service]:
+    """
+    Every service the question mentions: exact names (one inside a longer
+    matched name doesn't count separately), plus any word n-gram elsewhere
+    in the question above MATCH_THRESHOLD similarity to a name or distinctive
+    name word (so "balayage" still finds "Balyage").
+    """
+    padded = f" {text} "
+    exact = [name for name in SERVICE_INDEX if f" {name} " in padded]
+    exact = [name for name in exact if not any(name != other and f" {name} " in f" {other} " for other in exact)]
+    found = [SERVICE_INDEX[name] for name in exact]
+
+    # Fuzzy mentions are looked for in the text between the exact ones
+    for name in exact:
+        padded = padded.replace(f" {name} ", " | ")
+    for segment in padded.split("|"):
+        words = segment.split()
+        for size in range(1, MAX_NAME_WORDS + 1):
+            for i in range(len(words) - size + 1):
+                phrase = " ".join(words[i:i + size])
+                for name, service in ALIAS_INDEX.items():
+                    if service not in found and SequenceMatcher(None, phrase, name).ratio() > MATCH_THRESHOLD:
+                        found.append(service)
+    return found
+
+
+def match_service(text: str) -> Optional[Service]:
+    """The one service the question is about; None if it mentions none or several."""
+    found = find_services(text)
+    return found[0] if len(found) == 1 else None
+
+
+def answer_directly(user_input: str) -> Optional[str]:
+    """
+    Returns a templated answer for price / duration / list-all questions,
+    or None when the question should go to the LLM.
+    """
+    text = normalize(user_input)
+    if not text or any(word in f" {text}" for word in CONSULTATIVE_WORDS + POLICY_WORDS):
+        return None
+
+    if any(phrase in text for phrase in LIST_ALL_PHRASES):
+        return f"Here's everything we offer at Asuna Salon:\n\n{catalogue.listing_all}\n{BOOKING_HINT}"
+
+    words = set(text.split())
+    asks_price = any(w in text if " " in w or w == "£" else w in words for w in PRICE_WORDS)
+    asks_duration = any(w in text if " " in w else w in words for w in DURATION_WORDS)
+    if not (asks_price or asks_duration):
+        return None
+
+    service = match_service(text)
+    if service is None:
+        return None
+
+    name, price, duration = service.name, service.price, service.description
+    if asks_price and asks_duration:
+        answer = f"💎 **{name}** is {price} and takes about {duration}."
+    elif asks_price:
+        answer = f"💰 **{name}** is {price} ({duration})."
+    else:
+        answer = f"⏱ **{name}** takes about {duration} ({price})."
+    return f"{answer}\n\n{BOOKING_HINT}"
@@ -0,0 +1,66 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+
+class Overloaded(Exception):
+    """Raised when a request can't get an LLM slot; maps to 503 + Retry-After."""
+    def __init__(self, provider: str, retry_after: int):
+        super().__init__(f"Too many concurrent requests to {provider}")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """
+    Caps in-flight calls to one model provider. Up to `max_queue` callers
+    wait (each for at most `queue_timeout` seconds) for a free slot; anyone
+    beyond that is rejected immediately with Overloaded.
+    """
+    def __init__(self, provider: str, max_in_flight: int, max_queue: int, queue_timeout: float, retry_after: int):
+        self.provider = provider
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.semaphore = asyncio.Semaphore(max_in_flight)
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    def resize(self, max_in_flight: int, max_queue: int):
+        """Changes the limits; only safe while no caller holds or waits for a slot."""
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.semaphore = asyncio.Semaphore(max_in_flight)
+
+    def check(self):
+        """Raises Overloaded if a new caller would be rejected right now; takes nothing."""
+        if self.semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise Overloaded(self.provider, self.retry_after)
+
+    async def acquire(self):
+        """Takes a slot, queueing if allowed; raises Overloaded otherwise."""
+        self.check()
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise Overloaded(self.provider, self.retry_after) from None
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+
+    def release(self):
+        self.in_flight -= 1
+        self.semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
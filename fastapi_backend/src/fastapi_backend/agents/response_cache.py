@@ -0,0 +1,70 @@
+"""
+response_cache.py
+Caches Aria's answers to opening questions. Aria runs at temperature 0, so
+a repeated question gets the stored answer without another LLM call.
+
+A near-identical question only shares an answer when it has exactly the
+same content words: "how long does head spa take?" and "how long does the
+head spa take" differ in filler words only. Any other difference (a
+service, a number, a negation, "men" vs "women") means a different
+question, however similar the two look.
+
+The cache is per process and starts empty, like the catalogue it answers
+from, so a catalogue change (which needs a restart) never serves old answers.
+"""
+
+from typing import FrozenSet, Optional, Union
+from fastapi_backend.cache import TTLCache
+from fastapi_backend.settings import settings
+from .fast_path import normalize
+
+# Words that never change what is being asked. Negations, numbers, pronouns
+# and question words are content and stay in the key.
+STOPWORDS = frozenset(
+    "a an the is are am was were be been do does did please pls plz "
+    "hi hello hey thanks thank s just really so ok okay".split()
+)
+
+CacheKey = Union[str, FrozenSet[str]]
+
+
+def content_words(text: str) -> FrozenSet[str]:
+    """The words of a normalised prompt, minus STOPWORDS."""
+    return frozenset(word for word in text.split() if word not in STOPWORDS)
+
+
+class ResponseCache:
+    """
+    In-process TTL LRU of LLM answers, keyed by the prompt's content words
+    (`near_matches`) or by the whole normalised prompt.
+    """
+    def __init__(self, maxsize: int, ttl: float, near_matches: bool):
+        self.answers = TTLCache(maxsize, ttl)
+        self.near_matches = near_matches
+
+    def key(self, user_input: str) -> Optional[CacheKey]:
+        text = normalize(user_input)
+        if not text:
+            return None
+        return (content_words(text) or text) if self.near_matches else text
+
+    def get(self, user_input: str) -> Optional[str]:
+        """Returns a cached answer for this or an equivalent prompt, or None."""
+        key = self.key(user_input)
+        return None if key is None else self.answers.get(key)
+
+    def set(self, user_input: str, answer: str):
+        """Stores the answer Aria gave to an opening prompt."""
+        key = self.key(user_input)
+        if key is not None and answer and self.answers.maxsize > 0:
+            self.answers.set(key, answer)
+
+    def clear(self):
+        self.answers.clear()
+
+
+response_cache = ResponseCache(
+    settings.RESPONSE_CACHE_SIZE,
+    settings.RESPONSE_CACHE_TTL_SECONDS,
+    settings.RESPONSE_CACHE_NEAR_MATCHES,
+)
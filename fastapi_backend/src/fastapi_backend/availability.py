@@ -0,0 +1,93 @@
+"""
+availability.py
+Materialised availability calendar: per date, the merged busy intervals and
+the free slots already computed for each service duration. Built from
+OPENING_HOURS and bookings, patched in place when a booking commits, and
+expired after AVAILABILITY_CACHE_TTL_SECONDS so other workers' bookings
+show up too. The bookings_no_overlap constraint remains the final check.
+"""
+
+import logging
+from datetime import date, time, timedelta
+from typing import Dict, List, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from .booking_store import fetch_booked_intervals
+from .cache import TTLCache
+from .catalogue import catalogue
+from .opening_hours import OPENING_HOURS
+from .settings import settings
+from .utils import free_slots, merge_intervals
+
+logger = logging.getLogger("asuna_salon")
+
+
+class AvailabilityCalendar:
+    """
+    date -> (busy intervals, {service minutes: free 'HH:MM' slots}).
+    Slots for a (date, duration) pair are computed on first request.
+    """
+    def __init__(self, ttl: float, maxsize: int = 400):
+        self.days = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def slots_between(
+        self, db: AsyncSession, start: date, end: date, service_minutes: int
+    ) -> Dict[date, List[str]]:
+        """
+        Free slots for every open day from start to end (inclusive). Dates not
+        in the calendar are loaded together with one range query.
+        """
+        open_days = [
+            start + timedelta(days=offset)
+            for offset in range((end - start).days + 1)
+            if OPENING_HOURS.get((start + timedelta(days=offset)).weekday())
+        ]
+        missing = [day for day in open_days if self.days.get(day) is None]
+        if missing:
+            booked = await fetch_booked_intervals(db, missing[0], missing[-1])
+            for day in missing:
+                self.days.set(day, (merge_intervals(booked.get(day, ())), {}))
+
+        return {day: self.slots_for(day, service_minutes) for day in open_days}
+
+    def slots_for(self, day: date, service_minutes: int) -> List[str]:
+        """Free slots of one cached day, computing them for this duration if needed."""
+        entry = self.days.get(day)
+        hours = OPENING_HOURS.get(day.weekday())
+        if entry is None or not hours:
+            return []
+
+        busy, slots = entry
+        if service_minutes not in slots:
+            slots[service_minutes] = free_slots(
+                hours["start"],
+                hours["end"],
+                service_minutes,
+                busy=busy,
+                step=settings.SLOT_GRANULARITY_MINUTES,
+            )
+        return slots[service_minutes]
+
+    def record_booking(self, day: date, start: time, duration_minutes: int):
+        """Adds a committed booking to a cached day and drops its derived slots."""
+        entry = self.days.get(day)
+        if entry is None:
+            return
+        begin = start.hour * 60 + start.minute
+        busy = merge_intervals([*entry[0], (begin, begin + duration_minutes)])
+        self.days.set(day, (busy, {}))
+
+    def clear(self):
+        self.days.clear()
+
+    async def warm(self, db: AsyncSession, days: int):
+        """Preloads the next `days` days and their slots for every catalogue duration."""
+        if days <= 0:
+            return
+        start = date.today()
+        end = start + timedelta(days=days - 1)
+        for minutes in sorted({s.minutes for s in catalogue.services}):
+            await self.slots_between(db, start, end, minutes)
+        logger.info("Availability calendar warmed for %d days.", days)
+
+
+calendar = AvailabilityCalendar(ttl=settings.AVAILABILITY_CACHE_TTL_SECONDS)
@@ -0,0 +1,58 @@
+from collections import defaultdict
+from datetime import date
+from typing import Dict, List, Tuple
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from .models.booking_models import Booking, BookingCounter
+
+# Postgres SQLSTATE raised by the bookings_no_overlap exclusion constraint
+EXCLUSION_VIOLATION = "23P01"
+
+
+async def fetch_booked_intervals(
+    db: AsyncSession, start: date, end: date
+) -> Dict[date, List[Tuple[int, int]]]:
+    """
+    Loads every booking between start and end (inclusive) in a single range
+    query and groups them by date as [start, end) intervals in minutes since
+    midnight, using the duration stored on each booking.
+    """
+    stmt = (
+        select(Booking.date, Booking.time, Booking.duration_minutes)
+        .where(Booking.date.between(start, end))
+        .order_by(Booking.date, Booking.time)
+    )
+    result = await db.execute(stmt)
+
+    booked: Dict[date, List[Tuple[int, int]]] = defaultdict(list)
+    for booking_date, booking_time, duration in result.all():
+        begin = booking_time.hour * 60 + booking_time.minute
+        booked[booking_date].append((begin, begin + duration))
+    return booked
+
+
+async def next_booking_reference(db: AsyncSession, booking_date: date) -> str:
+    """
+    Allocates the next ASU-YYYYMMDD-NNN reference for a date with a single
+    atomic upsert on booking_counters. The counter row stays locked until the
+    caller's transaction ends, so concurrent bookings never share a suffix and
+    a rolled-back booking gives its number back.
+    """
+    stmt = (
+        insert(BookingCounter)
+        .values(date=booking_date, last_value=1)
+        .on_conflict_do_update(
+            index_elements=[BookingCounter.date],
+            set_={"last_value": BookingCounter.last_value + 1},
+        )
+        .returning(BookingCounter.last_value)
+    )
+    suffix = (await db.execute(stmt)).scalar_one()
+    return f"ASU-{booking_date.strftime('%Y%m%d')}-{suffix:03d}"
+
+
+def is_slot_conflict(error: IntegrityError) -> bool:
+    """True when an insert was rejected because it overlaps an existing booking."""
+    return getattr(error.orig, "sqlstate", None) == EXCLUSION_VIOLATION
@@ -0,0 +1,100 @@
+"""
+catalogue.py
+Indexed, pre-parsed view of salon_data.services, built once at import time.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+from fastapi_backend.salon_data import services
+
+HOURS_RE = re.compile(r"(\d+)\s*hr", re.IGNORECASE)
+MINUTES_RE = re.compile(r"(\d+)\s*min", re.IGNORECASE)
+PRICE_RE = re.compile(r"(\d+)(?:\.(\d{1,2}))?")
+
+# Used when a booked service is not in the catalogue
+DEFAULT_DURATION_MINUTES = 60
+
+CATEGORY_HEADER = "💎 **{category}** 💎\n─────────────────────────"
+
+
+def parse_duration(duration_str: str) -> int:
+    """Convert '2 hrs 15 mins' / '45 Minutes' → total minutes."""
+    hours = HOURS_RE.search(duration_str)
+    minutes = MINUTES_RE.search(duration_str)
+    return (int(hours.group(1)) * 60 if hours else 0) + (int(minutes.group(1)) if minutes else 0)
+
+
+def parse_price(price_str: str) -> int:
+    """Convert '£35.00' → 3500 pence."""
+    match = PRICE_RE.search(price_str.replace(",", ""))
+    if not match:
+        return 0
+    pounds, pence = match.groups()
+    return int(pounds) * 100 + int((pence or "0").ljust(2, "0"))
+
+
+class Service:
+    """One catalogue entry with its duration and price already parsed."""
+    __slots__ = ("name", "key", "category", "price", "price_pence", "description", "minutes", "label", "listing")
+
+    def __init__(self, raw: dict):
+        self.name: str = raw["name"]
+        self.key: str = self.name.casefold()
+        self.category: str = raw["category"]
+        self.price: str = raw["price"]
+        self.price_pence: int = parse_price(raw["price"])
+        self.description: str = raw["description"]
+        self.minutes: int = parse_duration(raw["description"])
+        self.label: str = f"{self.name} — {self.price} ({self.description})"
+        self.listing: str = f"• {self.label}"
+
+
+class Catalogue:
+    """
+    Services indexed by case-folded name and by category, with the
+    search_services listings rendered up front.
+    """
+    def __init__(self, raw_services: List[dict]):
+        self.services: Tuple[Service, ...] = tuple(Service(s) for s in raw_services)
+        self.by_key: Dict[str, Service] = {s.key: s for s in self.services}
+
+        self.by_category: Dict[str, Tuple[Service, ...]] = {}
+        for s in self.services:
+            self.by_category[s.category] = self.by_category.get(s.category, ()) + (s,)
+        self.categories: List[str] = sorted(self.by_category)
+
+        output = []
+        for category, items in self.by_category.items():
+            output.append(CATEGORY_HEADER.format(category=category))
+            output.extend(s.listing for s in items)
+            output.append("")  # spacing
+        self.listing_all: str = "\n".join(output)
+
+    def get(self, name: str) -> Optional[Service]:
+        """Case-insensitive lookup by exact service name."""
+        return self.by_key.get(name.strip().casefold())
+
+    def duration_minutes(self, name: str) -> int:
+        """Service duration in minutes, DEFAULT_DURATION_MINUTES if unknown."""
+        service = self.get(name)
+        return service.minutes if service else DEFAULT_DURATION_MINUTES
+
+    def search(self, keyword: str) -> str:
+        """
+        search_services output: everything grouped by category for "all",
+        otherwise the services whose name or category contains the keyword.
+        """
+        keyword = keyword.strip().casefold()
+        if keyword == "all":
+            return self.listing_all
+
+        matches = [
+            s.listing for s in self.services
+            if keyword in s.key or keyword in s.category.casefold()
+        ]
+        if not matches:
+            return f"⚠️ No matching services found for '{keyword}'."
+        return "\n".join(matches)
+
+
+catalogue = Catalogue(services)
@@ -1,49 +1,144 @@
 # asuna_salon_backend/database.py
 import os
-from supabase import Client, create_client
+import time
+from functools import lru_cache
 from fastapi_backend.settings import settings
+from fastapi_backend import metrics
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlmodel import SQLModel
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.orm import sessionmaker
-from typing import AsyncGenerator
+from typing import TYPE_CHECKING, AsyncGenerator
 
-# NOTE: Assuming your settings file contains these keys for Supabase
-supabase_url = settings.NEXT_PUBLIC_SUPABASE_URL
-supabase_key = settings.NEXT_PUBLIC_SUPABASE_ANON_KEY
-supabase_secret_key = settings.SUPABASE_SECRET_KEY
+if TYPE_CHECKING:
+    from supabase import Client
 
-# Initialize Supabase clients (optional, but good practice for full integration)
+# Supabase clients are built on first use: nothing in the request path needs them,
+# and importing/creating them is a large share of the app's import time.
 # Use the public key for client-side operations and the secret key for privileged operations
-supabase_public: Client = create_client(supabase_url, supabase_key)
-supabase_admin: Client = create_client(supabase_url, supabase_secret_key)
+def create_supabase_client(key: str | None) -> "Client":
+    from supabase import create_client
+
+    if not settings.NEXT_PUBLIC_SUPABASE_URL or not key:
+        raise RuntimeError("Supabase is not configured (NEXT_PUBLIC_SUPABASE_URL and key settings)")
+    return create_client(settings.NEXT_PUBLIC_SUPABASE_URL, key)
+
+
+@lru_cache(maxsize=1)
+def get_supabase_public() -> "Client":
+    """Supabase client using the anon key."""
+    return create_supabase_client(settings.NEXT_PUBLIC_SUPABASE_ANON_KEY)
+
+
+@lru_cache(maxsize=1)
+def get_supabase_admin() -> "Client":
+    """Supabase client using the service (secret) key, for privileged operations."""
+    return create_supabase_client(settings.SUPABASE_SECRET_KEY)
 
 # Replace 'postgresql' with 'postgresql+asyncpg' to use the asyncpg driver
 connection_string = str(settings.DIRECT_URL.replace('postgresql', 'postgresql+asyncpg'))
 
-# Configure async engine with production optimizations
+# Engine defaults per DB_PROFILE; DB_* settings override individual values
+ENGINE_PROFILES = {
+    "dev": {"echo": True, "pool_size": 5, "max_overflow": 10, "pool_timeout": 30, "statement_timeout_ms": 0},
+    "prod": {"echo": False, "pool_size": 10, "max_overflow": 5, "pool_timeout": 10, "statement_timeout_ms": 15000},
+}
+
+
+def engine_options() -> dict:
+    """Resolves the engine profile against any DB_* overrides."""
+    profile = ENGINE_PROFILES[settings.DB_PROFILE]
+    overrides = {
+        "echo": settings.DB_ECHO,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "statement_timeout_ms": settings.DB_STATEMENT_TIMEOUT_MS,
+    }
+    return {key: profile[key] if value is None else value for key, value in overrides.items()}
+
+
+class PoolMetrics:
+    """Connection checkout counters, shared by every pool the engine creates."""
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, waited: float):
+        self.checkouts += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        metrics.pool_wait.observe(waited)
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that times each checkout, including any wait for a free connection."""
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            pool_metrics.timeouts += 1
+            metrics.pool_timeouts.inc()
+            raise
+        finally:
+            pool_metrics.record(time.perf_counter() - started)
+
+
+options = engine_options()
+server_settings = {"application_name": settings.DB_APPLICATION_NAME}
+if options["statement_timeout_ms"]:
+    server_settings["statement_timeout"] = str(options["statement_timeout_ms"])
+
 async_engine = create_async_engine(
     connection_string,
-    echo=True, # Set to False in production
+    echo=options["echo"],
     future=True,
-    # Crucial for PgBouncer/Supavisor transaction mode: disable prepared statement cache
-    connect_args={"statement_cache_size": 0},
-    
+    poolclass=InstrumentedPool,
+    pool_size=options["pool_size"],
+    max_overflow=options["max_overflow"],
+    pool_timeout=options["pool_timeout"],
+    connect_args={
+        # Crucial for PgBouncer/Supavisor transaction mode: disable prepared statement cache
+        "statement_cache_size": 0,
+        "server_settings": server_settings,
+    },
+
     # Recommended for pooled connections:
     pool_pre_ping=True, # Pings connections before use
     pool_recycle=3600 # Recycles connections after 1 hour
 )
 
+
+def pool_stats() -> dict:
+    """Current pool occupancy plus cumulative checkout/wait metrics."""
+    pool = async_engine.pool
+    checkouts = pool_metrics.checkouts
+    return {
+        "profile": settings.DB_PROFILE,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": options["max_overflow"],
+        "checkouts": checkouts,
+        "timeouts": pool_metrics.timeouts,
+        "wait_ms_avg": round(pool_metrics.wait_seconds_total / checkouts * 1000, 3) if checkouts else 0.0,
+        "wait_ms_max": round(pool_metrics.wait_seconds_max * 1000, 3),
+    }
+
+metrics.instrument_engine(async_engine.sync_engine)
+
 # Define an async sessionmaker
 AsyncSessionLocal = sessionmaker(
     async_engine, class_=AsyncSession, expire_on_commit=False
 )
 
-# Function to create database tables
-async def create_db_tables():
-    async with async_engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
-
 # Dependency to get an async session for FastAPI
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
@@ -0,0 +1,117 @@
+"""
+gunicorn_conf.py
+Multi-worker serving mode: gunicorn master with uvicorn workers.
+
+    gunicorn -c python:fastapi_backend.gunicorn_conf fastapi_backend.main:app
+
+Migrations are applied beforehand, as a release step (`uv run migrate`);
+the master and each worker only check the schema version. Each worker
+starts with a fresh connection pool and empty in-process caches. With more
+than one worker, cached sessions are always checked against the database
+(SESSION_CACHE_VERIFY), and LLM_MAX_IN_FLIGHT / LLM_MAX_QUEUE are divided
+between the workers.
+
+Every worker has its own DB pool, so keep WEB_CONCURRENCY x (DB_POOL_SIZE +
+DB_MAX_OVERFLOW) within the database's connection limit. Without
+WEB_CONCURRENCY, workers follow the CPUs actually available (container CPU
+quota included), up to MAX_WORKERS.
+"""
+
+import asyncio
+import math
+import os
+import sys
+
+# Default worker count ceiling: each worker opens up to DB_POOL_SIZE +
+# DB_MAX_OVERFLOW connections (15 on either profile)
+MAX_WORKERS = int(os.getenv("MAX_WORKERS", "4"))
+
+
+def cgroup_cpu_limit() -> float | None:
+    """The container's CPU quota in CPUs (cgroup v2, then v1), or None if unlimited."""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        return quota / period if quota > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on, rounded up to the container's CPU quota if lower."""
+    cpus = os.process_cpu_count() or 1
+    limit = cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, max(1, math.ceil(limit)))
+    return cpus
+
+
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+worker_class = "uvicorn.workers.UvicornWorker"
+# Async workers: one per available core is enough to keep each core busy
+workers = int(os.getenv("WEB_CONCURRENCY") or min(available_cpus(), MAX_WORKERS))
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))   # agent runs can take a while
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+loglevel = os.getenv("LOG_LEVEL", "info")
+
+def on_starting(server):
+    """
+    Runs once in the master, before any worker is forked. Refuses to start
+    on a database with pending migrations; applying them (`uv run migrate`)
+    is a separate release step.
+    """
+    from fastapi_backend.database import async_engine
+    from fastapi_backend.migrations import SchemaVersionError, check_schema_version
+
+    async def check_schema() -> int:
+        try:
+            return await check_schema_version()
+        finally:
+            # Connections belong to this event loop; don't hand them to the workers
+            await async_engine.dispose()
+
+    try:
+        version = asyncio.run(check_schema())
+    except SchemaVersionError as e:
+        server.log.error("%s", e)
+        sys.exit(1)
+    server.log.info("Database schema at version %s", version)
+
+
+def post_fork(server, worker):
+    """
+    Makes sure nothing pooled or cached in the master is shared with a
+    worker, turns on cached-session checks when there are several workers,
+    and gives the worker its share of the LLM concurrency budget.
+    """
+    from fastapi_backend.database import async_engine
+    from fastapi_backend.session_store import session_cache
+    from fastapi_backend.availability import calendar
+    from fastapi_backend.agents.response_cache import response_cache
+    from fastapi_backend.agents.config_agents import LLM_MAX_IN_FLIGHT, LLM_MAX_QUEUE, llm_limiter
+    from fastapi_backend.settings import settings
+
+    # Drop inherited pool connections without closing the master's sockets
+    async_engine.sync_engine.dispose(close=False)
+    session_cache.clear()
+    calendar.clear()
+    response_cache.clear()
+    if server.cfg.workers > 1:
+        # A session's next turn can land on another worker, so a cached history
+        # may be stale; saving on top of it would collide on (session_id, seq).
+        # Checked here rather than from `workers` above so `gunicorn -w N` counts.
+        settings.SESSION_CACHE_VERIFY = True
+    # The LLM budget is for the whole server, not per worker
+    llm_limiter.resize(
+        max(1, LLM_MAX_IN_FLIGHT // server.cfg.workers),
+        max(1, LLM_MAX_QUEUE // server.cfg.workers),
+    )
@@ -1,28 +1,44 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
-from .database import create_db_tables, get_db
+from .database import get_db, AsyncSessionLocal, pool_stats
+from .migrations import check_schema_version
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from .models.booking_models import Booking, BookingCreate, BookingOut
 from .models.session_models import SessionHistory
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Query
 from sqlalchemy import select
-from datetime import datetime, timezone, timedelta
-from .utils import get_service_duration, generate_time_slots
+from sqlalchemy.exc import IntegrityError
+from datetime import date, datetime, timezone, timedelta
+from .utils import get_service_duration, slot_bitmap
+from .booking_store import next_booking_reference, is_slot_conflict
+from .availability import calendar
+from .settings import settings
 from fastapi_backend.opening_hours import OPENING_HOURS
-from fastapi_backend.agents.config_agents import config
+from fastapi_backend.agents.config_agents import config, llm_limiter
+from fastapi_backend.agents.limiter import Overloaded
+from fastapi_backend import metrics
 import logging
+import time
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("asuna_salon")
 
+# How far ahead /bookings/available-times searches for free slots
+LOOKAHEAD_DAYS = 14
+# Longest range /bookings/availability returns in one call
+MAX_AVAILABILITY_RANGE_DAYS = 62
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting up Asuna Salon backend...")
-    logger.info("CREATING DATABASE TABLES...")
-    await create_db_tables()
-    logger.info("Database tables created successfully.")
+    # Schema changes are applied by `migrate`; startup only checks the version
+    version = await check_schema_version()
+    logger.info("Database schema at version %s", version)
+    async with AsyncSessionLocal() as db:
+        await calendar.warm(db, settings.AVAILABILITY_WARM_DAYS)
     
     yield
     logger.info("Shutting down Asuna Salon backend...")
@@ -60,6 +76,17 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"], 
 )
+# Outermost, so latency covers CORS handling and the full streamed body
+app.add_middleware(metrics.MetricsMiddleware)
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request, exc: Overloaded):
+    """Shed load quickly instead of queueing without bound behind the model provider."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Aria is busy right now. Please try again shortly."},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
 # --------- ENDPOINTS---------
 
@@ -73,20 +100,31 @@ async def root():
 def health_check():
     return {"status": "ok"}
 
+@app.get("/health/db", include_in_schema=False)
+def db_health():
+    """Connection pool occupancy and checkout wait metrics for this worker."""
+    return pool_stats()
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """This worker's request, DB, pool and LLM metrics in Prometheus text format."""
+    stats = pool_stats()
+    metrics.pool_connections.set(stats["checked_out"], state="checked_out")
+    metrics.pool_connections.set(stats["size"], state="pool_size")
+    metrics.pool_connections.set(max(stats["overflow"], 0), state="overflow")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.post("/bookings", response_model=BookingOut)
 async def create_booking(data: BookingCreate, db: AsyncSession = Depends(get_db)):
     """Create a new booking with a unique reference code."""
-    base_ref = f"ASU-{data.date.strftime('%Y%m%d')}"
-    result = await db.execute(select(Booking).where(Booking.date == data.date))
-    bookings_today = result.scalars().all()
-    suffix = len(bookings_today) + 1
-    reference = f"{base_ref}-{suffix:03d}"
+    reference = await next_booking_reference(db, data.date)
 
     new_booking = Booking(
         service=data.service,
         category=data.category,
         date=data.date,
         time=data.time,
+        duration_minutes=get_service_duration(data.service),
         client_name=data.client_name,
         reference=reference,
     )
@@ -94,11 +132,22 @@ async def create_booking(data: BookingCreate, db: AsyncSession = Depends(get_db)
 
     try:
         await db.commit()
-        await db.refresh(new_booking)
+    except IntegrityError as e:
+        await db.rollback()
+        if is_slot_conflict(e):
+            raise HTTPException(status_code=409, detail="This time slot has just been booked. Please choose another time.")
+        raise HTTPException(status_code=400, detail=f"Could not save booking: {str(e)}")
     except Exception as e:
         await db.rollback()
         raise HTTPException(status_code=400, detail=f"Could not save booking: {str(e)}")
 
+    # The booking is saved from here on; don't report it as failed
+    await db.refresh(new_booking)
+    try:
+        calendar.record_booking(new_booking.date, new_booking.time, new_booking.duration_minutes)
+    except Exception:
+        logger.exception("Could not update the availability calendar for %s", new_booking.date)
+        calendar.days.pop(new_booking.date)   # reloaded from the database on next use
     return new_booking
 
 
@@ -107,42 +156,80 @@ async def create_booking(data: BookingCreate, db: AsyncSession = Depends(get_db)
 async def get_available_times(
     date: str, 
     service: str, 
+    days: int = Query(1, ge=1, le=LOOKAHEAD_DAYS),
     db: AsyncSession = Depends(get_db)):
+    """
+    Returns free slots for the first `days` open days with availability,
+    looking up to LOOKAHEAD_DAYS ahead. Served from the availability
+    calendar; days it doesn't hold yet are read in one query.
+    """
     try:
         service_minutes = get_service_duration(service)
-        check_date = datetime.strptime(date, "%Y-%m-%d").date()
-
-        for _ in range(14):  # look up to 14 days ahead
-            weekday = check_date.weekday()
-            hours = OPENING_HOURS.get(weekday)
-
-            if not hours:
-                check_date += timedelta(days=1)
-                continue
+        start_date = datetime.strptime(date, "%Y-%m-%d").date()
+        end_date = start_date + timedelta(days=LOOKAHEAD_DAYS - 1)
 
-            all_slots = generate_time_slots(hours["start"], hours["end"], service_minutes)
+        slots_by_date = await calendar.slots_between(db, start_date, end_date, service_minutes)
 
-            result = await db.execute(
-                select(Booking.time).where(Booking.date == check_date)
-            )
-            booked = [row[0] for row in result.fetchall()]
-            available = [t for t in all_slots if t not in booked]
+        found = [
+            {"date": str(day), "available": available}
+            for day, available in slots_by_date.items()
+            if available
+        ][:days]
 
-            if available:
-                return {"date": str(check_date), "available": available}
+        if not found:
+            return {"date": None, "available": [], "days": []}
 
-            check_date += timedelta(days=1)
-
-        return {"date": None, "available": []}
+        return {"date": found[0]["date"], "available": found[0]["available"], "days": found}
 
     except Exception as e:
         # Never leak raw tracebacks
         return {"date": None, "available": [], "error": str(e)}
 
+@app.get("/bookings/availability")
+async def get_availability(
+    service: str,
+    from_date: date = Query(..., alias="from"),
+    to_date: date = Query(..., alias="to"),
+    db: AsyncSession = Depends(get_db)):
+    """
+    Month-view availability for a service. Each day carries a hex bitmap over
+    its slot grid (opening time + i * step, first slot = most significant bit);
+    closed days have "open": null. Bookings are read in at most one query.
+    """
+    span = (to_date - from_date).days + 1
+    if span < 1 or span > MAX_AVAILABILITY_RANGE_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"'to' must be on or after 'from' and at most {MAX_AVAILABILITY_RANGE_DAYS} days later.",
+        )
+
+    service_minutes = get_service_duration(service)
+    step = settings.SLOT_GRANULARITY_MINUTES
+    slots_by_date = await calendar.slots_between(db, from_date, to_date, service_minutes)
+
+    days = []
+    for offset in range(span):
+        day = from_date + timedelta(days=offset)
+        hours = OPENING_HOURS.get(day.weekday())
+        if not hours:
+            days.append({"date": str(day), "open": None, "bitmap": "", "slots": 0, "free": 0})
+            continue
+
+        free = slots_by_date.get(day, [])
+        bitmap, count = slot_bitmap(free, hours["start"], hours["end"], service_minutes, step)
+        days.append({"date": str(day), "open": hours["start"], "bitmap": bitmap, "slots": count, "free": len(free)})
+
+    return {"service": service, "duration": service_minutes, "step": step, "days": days}
+
 # --------- AGENT ENDPOINTS  ---------
+import json
 from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from openai.types.responses import ResponseTextDeltaEvent
 from .session_store import PostgresSessionStore
 from .agents.marketing_agent import aria
+from .agents.fast_path import answer_directly
+from .agents.response_cache import response_cache
 from agents import Runner
 
 class AgentRunRequest(BaseModel):
@@ -152,28 +239,113 @@ class AgentRunRequest(BaseModel):
 class AgentRunResponse(BaseModel):
     response: str
 
+async def record_direct_answer(session_store: PostgresSessionStore, user_input: str, answer: str):
+    """Appends a question answered without the LLM to the session so Aria keeps the context."""
+    await session_store.add_items([
+        {"role": "user", "content": user_input},
+        {"role": "assistant", "content": answer},
+    ])
+    await session_store.save()
+
+
 @app.post("/agent/run", response_model=AgentRunResponse)
-async def agent_run(req: AgentRunRequest, db: AsyncSession = Depends(get_db)):
+async def agent_run(req: AgentRunRequest):
     """
     Runs the Aria agent for a given user input and session.
+    Plain price/duration/catalogue questions are answered without the LLM, and
+    so are opening questions Aria has already answered (see response_cache).
+    The session store loads and saves in their own short transactions, so no
+    pooled DB connection is held while the model is working.
     """
-    session_store = PostgresSessionStore(session_id=req.session_id, db=db)
+    session_store = PostgresSessionStore(session_id=req.session_id)
     await session_store.load_or_create()
-
-    # The Runner is expected to work with a session object that has a 'messages' property
-    # and potentially methods like 'add_message'. The PostgresSessionStore is designed
-    # to be compatible with this pattern.
-    result = await Runner.run(
-        aria,
-        req.user_input,
-        session=session_store,
-        run_config=config,
-    )
+    opening = session_store.is_new
+
+    direct = answer_directly(req.user_input) or (response_cache.get(req.user_input) if opening else None)
+    if direct:
+        await record_direct_answer(session_store, req.user_input, direct)
+        return {"response": direct}
+
+    async with llm_limiter.slot():
+        # The Runner is expected to work with a session object that has a 'messages' property
+        # and potentially methods like 'add_message'. The PostgresSessionStore is designed
+        # to be compatible with this pattern.
+        started = time.perf_counter()
+        result = await Runner.run(
+            aria,
+            req.user_input,
+            session=session_store,
+            run_config=config,
+        )
+        metrics.record_llm_run("run", time.perf_counter() - started, result.context_wrapper.usage)
 
 
     # The runner modifies the session history in-place. We save the changes.
     await session_store.save()
+    if opening:
+        response_cache.set(req.user_input, result.final_output)
 
     # return {"response": result.final_output}
     return {"response": result.final_output}
 
+
+def sse(data: dict, event: str | None = None) -> str:
+    """Formats one Server-Sent Event."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+@app.post("/agent/run/stream")
+async def agent_run_stream(req: AgentRunRequest):
+    """
+    Runs the Aria agent and streams its reply as Server-Sent Events:
+    'data: {"delta": ...}' per text chunk, then 'event: done' with the full
+    response, or 'event: error' if the run fails. Returns 503 up front when
+    the model provider's queue is already full.
+    """
+    direct = answer_directly(req.user_input)
+    cached = None if direct else response_cache.get(req.user_input)
+    if not (direct or cached):
+        llm_limiter.check()
+
+    async def events():
+        # The session store opens its own short DB sessions for load and save
+        session_store = PostgresSessionStore(session_id=req.session_id)
+        try:
+            await session_store.load_or_create()
+            opening = session_store.is_new
+            answer = direct or (cached if opening else None)
+            if answer:
+                await record_direct_answer(session_store, req.user_input, answer)
+                yield sse({"delta": answer})
+                yield sse({"response": answer}, event="done")
+                return
+
+            async with llm_limiter.slot():
+                started = time.perf_counter()
+                result = Runner.run_streamed(
+                    aria,
+                    req.user_input,
+                    session=session_store,
+                    run_config=config,
+                )
+                async for event in result.stream_events():
+                    if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                        yield sse({"delta": event.data.delta})
+            metrics.record_llm_run("stream", time.perf_counter() - started, result.context_wrapper.usage)
+
+            await session_store.save()
+            if opening:
+                response_cache.set(req.user_input, result.final_output)
+            yield sse({"response": result.final_output}, event="done")
+        except Overloaded:
+            yield sse({"error": "Aria is busy right now. Please try again shortly."}, event="error")
+        except Exception:
+            logger.exception("Streamed agent run failed for session %s", req.session_id)
+            yield sse({"error": "Aria is unavailable right now. Please try again."}, event="error")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,219 @@
+"""
+metrics.py
+Request-level performance metrics, exposed in Prometheus text format on
+/metrics:
+
+- per-route request latency, request counts by status, and requests in flight
+- SQL statements and DB time per request, from SQLAlchemy engine events
+- LLM call latency and token usage, from each agent run's usage
+- connection pool checkout waits
+
+A small in-process registry, so no client library is needed. Values are
+per worker process; under gunicorn each scrape sees whichever worker
+answered, so give every worker its own scrape target (or aggregate).
+"""
+
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LabelValues = Tuple[str, ...]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34)
+
+
+def format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        registry.append(self)
+
+    def key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self.key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{format_labels(self.labelnames, key)} {format_value(value)}"
+            for key, value in self.values.items()
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels: str):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str):
+        self.values[self.key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        # label values -> (per-bucket counts incl. +Inf, sum)
+        self.values: Dict[LabelValues, Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self.key(labels)
+        counts, total = self.values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+        counts[bisect_left(self.buckets, value)] += 1
+        self.values[key] = (counts, total + value)
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for key, (counts, total) in self.values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = 'le="{}"'.format(bound if bound == "+Inf" else format_value(bound))
+                lines.append(f"{self.name}_bucket{format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labelnames, key)} {format_value(round(total, 6))}")
+            lines.append(f"{self.name}_count{format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+registry: List[Metric] = []
+
+http_requests = Counter("http_requests_total", "HTTP requests handled.", ("method", "route", "status"))
+http_latency = Histogram("http_request_duration_seconds", "HTTP request latency.", ("method", "route"))
+http_in_flight = Gauge("http_requests_in_flight", "HTTP requests currently being handled.")
+request_db_queries = Histogram(
+    "http_request_db_queries", "SQL statements executed per request.", ("route",), QUERY_COUNT_BUCKETS
+)
+request_db_time = Histogram("http_request_db_seconds", "Time spent in SQL statements per request.", ("route",))
+db_queries = Counter("db_queries_total", "SQL statements executed.")
+llm_latency = Histogram("llm_run_duration_seconds", "Agent run latency, including tool calls.", ("mode",))
+llm_requests = Counter("llm_requests_total", "Requests made to the model provider.", ("mode",))
+llm_tokens = Counter("llm_tokens_total", "Tokens used by the model.", ("mode", "kind"))
+pool_wait = Histogram("db_pool_checkout_wait_seconds", "Time to check a connection out of the pool.")
+pool_connections = Gauge("db_pool_connections", "Pool connections by state.", ("state",))
+pool_timeouts = Counter("db_pool_timeouts_total", "Checkouts that timed out waiting for a connection.")
+
+
+class RequestStats:
+    """DB work done while handling one request."""
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+def instrument_engine(engine: Engine):
+    """Counts and times every SQL statement, attributing it to the current request."""
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        db_queries.inc()
+        stats = current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def on_error(exception_context):
+        # after_cursor_execute doesn't run for failed statements
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
+
+
+def record_llm_run(mode: str, seconds: float, usage):
+    """Records one agent run; `usage` is result.context_wrapper.usage."""
+    llm_latency.observe(seconds, mode=mode)
+    llm_requests.inc(usage.requests, mode=mode)
+    llm_tokens.inc(usage.input_tokens, mode=mode, kind="input")
+    llm_tokens.inc(usage.output_tokens, mode=mode, kind="output")
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing each HTTP request (streamed bodies included) and
+    collecting the DB work done for it. Routes are labelled by their path
+    template, so path parameters don't create new series.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        http_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_in_flight.dec()
+            current_request.reset(token)
+
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            http_requests.inc(method=method, route=route, status=str(status["code"]))
+            http_latency.observe(elapsed, method=method, route=route)
+            request_db_queries.observe(stats.queries, route=route)
+            request_db_time.observe(stats.db_seconds, route=route)
+
+
+def render() -> str:
+    """All metrics in Prometheus text exposition format."""
+    lines: List[str] = []
+    for metric in registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
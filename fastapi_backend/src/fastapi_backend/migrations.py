@@ -0,0 +1,331 @@
+"""
+migrations.py
+Versioned schema migrations. Each migration runs once, in its own
+transaction, and is recorded in schema_migrations. Migrating is a release
+step, run before the new build is started; the app itself never runs DDL:
+on startup it only checks that the database is at LATEST_VERSION.
+
+    uv run migrate               # apply pending migrations
+    uv run migrate --status      # show current / latest version
+    python -m fastapi_backend.migrations
+
+Migrations are plain DDL, frozen as written, not generated from the current
+models. New migrations are appended to MIGRATIONS with the next version
+number; never edit one that has shipped.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from typing import Awaitable, Callable, List, NamedTuple
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from fastapi_backend.database import async_engine
+
+logger = logging.getLogger("asuna_salon")
+
+# Serialises migrations between processes booting at the same time
+SCHEMA_LOCK_ID = 7_260_417
+
+CREATE_MIGRATIONS_TABLE = text("""
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        description TEXT NOT NULL,
+        applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+""")
+
+# The schema the old create_all-on-boot produced; IF NOT EXISTS adopts those databases
+BASE_TABLES = [
+    text("""
+        CREATE TABLE IF NOT EXISTS bookings (
+            id UUID NOT NULL,
+            service VARCHAR NOT NULL,
+            category VARCHAR,
+            date DATE NOT NULL,
+            time TIME WITHOUT TIME ZONE NOT NULL,
+            client_name VARCHAR NOT NULL,
+            reference VARCHAR,
+            PRIMARY KEY (id)
+        )
+    """),
+    text("CREATE UNIQUE INDEX IF NOT EXISTS ix_bookings_reference ON bookings (reference)"),
+    text("CREATE INDEX IF NOT EXISTS ix_bookings_id ON bookings (id)"),
+    text("""
+        CREATE TABLE IF NOT EXISTS session_history (
+            session_id VARCHAR NOT NULL,
+            history JSONB NOT NULL,
+            PRIMARY KEY (session_id)
+        )
+    """),
+    text("CREATE INDEX IF NOT EXISTS ix_session_history_session_id ON session_history (session_id)"),
+]
+
+ADD_BOOKING_DURATION = text(
+    "ALTER TABLE bookings ADD COLUMN IF NOT EXISTS duration_minutes INTEGER NOT NULL DEFAULT 60"
+)
+
+# Service durations as the catalogue had them when this migration was written;
+# names match case-insensitively, anything else keeps the 60-minute default
+SET_BOOKING_DURATIONS = text("""
+    UPDATE bookings b SET duration_minutes = d.minutes
+    FROM (VALUES
+        ('cut, wash & blowdry', 45),
+        ('restyle with blow-dry', 30),
+        ('party hair', 120),
+        ('bridal hair', 155),
+        ('balyage', 135),
+        ('head spa', 110),
+        ('herbal facial', 95),
+        ('full body wax', 120),
+        ('hollywood bikini line wax', 155),
+        ('crystal clear dermabrasion', 60)
+    ) AS d(service, minutes)
+    WHERE lower(trim(b.service)) = d.service AND b.duration_minutes <> d.minutes
+""")
+
+# Pairs of bookings the guard below would reject. Bookings end before midnight,
+# so only same-day pairs need checking.
+FIND_OVERLAPPING_BOOKINGS = text("""
+    SELECT a.date, a.time, a.service, coalesce(a.reference, a.id::text),
+           b.time, b.service, coalesce(b.reference, b.id::text)
+    FROM bookings a
+    JOIN bookings b ON b.date = a.date AND (a.time, a.id) < (b.time, b.id)
+    WHERE tsrange(a.date + a.time, a.date + a.time + make_interval(mins => a.duration_minutes), '[)')
+       && tsrange(b.date + b.time, b.date + b.time + make_interval(mins => b.duration_minutes), '[)')
+    ORDER BY a.date, a.time, b.time
+""")
+
+# Rejects any two bookings whose [start, start + duration) ranges overlap
+BOOKING_SLOT_GUARD = text("""
+    DO $$
+    BEGIN
+        ALTER TABLE bookings ADD CONSTRAINT bookings_no_overlap EXCLUDE USING gist (
+            tsrange(date + time, date + time + make_interval(mins => duration_minutes), '[)') WITH &&
+        );
+    EXCEPTION
+        WHEN duplicate_table OR duplicate_object THEN NULL;
+    END $$
+""")
+
+# Overlapping pairs listed in the error before the rest are counted
+MAX_REPORTED_OVERLAPS = 20
+
+# Tables below may already exist where create_all-on-boot ran with newer models
+CREATE_BOOKING_COUNTERS = text("""
+    CREATE TABLE IF NOT EXISTS booking_counters (
+        date DATE NOT NULL,
+        last_value INTEGER NOT NULL,
+        PRIMARY KEY (date)
+    )
+""")
+
+# Seeds booking_counters from references issued before the counter existed
+BACKFILL_BOOKING_COUNTERS = text("""
+    INSERT INTO booking_counters (date, last_value)
+    SELECT date, MAX(CAST(split_part(reference, '-', 3) AS INTEGER))
+    FROM bookings
+    WHERE reference ~ '^ASU-[0-9]{8}-[0-9]+$'
+    GROUP BY date
+    ON CONFLICT (date) DO NOTHING
+""")
+
+CREATE_SESSION_ITEMS = text("""
+    CREATE TABLE IF NOT EXISTS session_items (
+        session_id VARCHAR NOT NULL,
+        seq INTEGER NOT NULL,
+        item JSONB NOT NULL,
+        PRIMARY KEY (session_id, seq)
+    )
+""")
+
+CREATE_SESSION_SUMMARIES = text("""
+    CREATE TABLE IF NOT EXISTS session_summaries (
+        session_id VARCHAR NOT NULL,
+        upto_seq INTEGER NOT NULL,
+        summary TEXT NOT NULL,
+        PRIMARY KEY (session_id)
+    )
+""")
+
+# Legacy session_history arrays become session_items rows (seq = array position).
+# Sessions that already have items were written by the new store; leave them be.
+COPY_SESSION_HISTORY = text("""
+    INSERT INTO session_items (session_id, seq, item)
+    SELECT h.session_id, t.ord - 1, t.elem
+    FROM session_history h, jsonb_array_elements(h.history) WITH ORDINALITY AS t(elem, ord)
+    WHERE jsonb_typeof(h.history) = 'array'
+      AND NOT EXISTS (SELECT 1 FROM session_items i WHERE i.session_id = h.session_id)
+    ON CONFLICT DO NOTHING
+""")
+
+# Covering index for booking lookups by date (see Booking.__table_args__)
+BOOKING_DATE_TIME_INDEX = text("""
+    CREATE INDEX IF NOT EXISTS ix_bookings_date_time
+    ON bookings (date, time) INCLUDE (duration_minutes)
+""")
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[AsyncConnection], Awaitable[None]]
+
+
+async def create_base_tables(conn: AsyncConnection):
+    for statement in BASE_TABLES:
+        await conn.execute(statement)
+
+
+async def add_booking_slot_guard(conn: AsyncConnection):
+    await conn.execute(ADD_BOOKING_DURATION)
+
+    # Existing rows got the default; give them their service's real duration
+    await conn.execute(SET_BOOKING_DURATIONS)
+
+    overlaps = (await conn.execute(FIND_OVERLAPPING_BOOKINGS)).all()
+    if overlaps:
+        lines = [
+            f"  {day} {first_time:%H:%M} {first_service} ({first_ref}) overlaps "
+            f"{second_time:%H:%M} {second_service} ({second_ref})"
+            for day, first_time, first_service, first_ref, second_time, second_service, second_ref
+            in overlaps[:MAX_REPORTED_OVERLAPS]
+        ]
+        if len(overlaps) > MAX_REPORTED_OVERLAPS:
+            lines.append(f"  ... and {len(overlaps) - MAX_REPORTED_OVERLAPS} more")
+        raise MigrationError(
+            f"Can't add the booking overlap guard: {len(overlaps)} pair(s) of existing bookings overlap.\n"
+            + "\n".join(lines)
+            + "\nReschedule or cancel one booking of each pair, then run `migrate` again."
+        )
+
+    await conn.execute(BOOKING_SLOT_GUARD)
+
+
+async def create_booking_counters(conn: AsyncConnection):
+    await conn.execute(CREATE_BOOKING_COUNTERS)
+
+
+async def backfill_booking_counters(conn: AsyncConnection):
+    await conn.execute(BACKFILL_BOOKING_COUNTERS)
+
+
+async def create_session_items(conn: AsyncConnection):
+    await conn.execute(CREATE_SESSION_ITEMS)
+
+
+async def create_session_summaries(conn: AsyncConnection):
+    await conn.execute(CREATE_SESSION_SUMMARIES)
+
+
+async def add_booking_date_time_index(conn: AsyncConnection):
+    await conn.execute(BOOKING_DATE_TIME_INDEX)
+
+
+async def copy_session_history(conn: AsyncConnection):
+    await conn.execute(COPY_SESSION_HISTORY)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Base tables", create_base_tables),
+    Migration(2, "Booking duration and overlap guard", add_booking_slot_guard),
+    Migration(3, "Booking counters table", create_booking_counters),
+    Migration(4, "Seed booking counters from existing references", backfill_booking_counters),
+    Migration(5, "Session items table", create_session_items),
+    Migration(6, "Session summaries table", create_session_summaries),
+    Migration(7, "Covering (date, time) index on bookings", add_booking_date_time_index),
+    Migration(8, "Copy legacy session_history into session_items", copy_session_history),
+]
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+class SchemaVersionError(RuntimeError):
+    """The database schema is older than this build expects."""
+
+
+class MigrationError(RuntimeError):
+    """A migration can't be applied to the data currently in the database."""
+
+
+async def current_version(conn: AsyncConnection) -> int:
+    """The highest applied migration, or 0 for a database that was never migrated."""
+    exists = (await conn.execute(text("SELECT to_regclass('schema_migrations')"))).scalar()
+    if exists is None:
+        return 0
+    version = (await conn.execute(text("SELECT MAX(version) FROM schema_migrations"))).scalar()
+    return version or 0
+
+
+async def migrate(engine: AsyncEngine = async_engine) -> int:
+    """Applies pending migrations in order and returns the resulting version."""
+    version = 0
+    for migration in MIGRATIONS:
+        async with engine.begin() as conn:
+            # Backfills and index builds may outrun the prod profile's statement_timeout
+            await conn.execute(text("SET LOCAL statement_timeout = 0"))
+            await conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": SCHEMA_LOCK_ID})
+            await conn.execute(CREATE_MIGRATIONS_TABLE)
+            version = await current_version(conn)
+            if migration.version <= version:
+                continue
+
+            logger.info("Applying migration %s: %s", migration.version, migration.description)
+            await migration.apply(conn)
+            await conn.execute(
+                text("INSERT INTO schema_migrations (version, description) VALUES (:version, :description)"),
+                {"version": migration.version, "description": migration.description},
+            )
+            version = migration.version
+    return version
+
+
+async def check_schema_version(engine: AsyncEngine = async_engine) -> int:
+    """
+    Startup check: raises SchemaVersionError if migrations are pending.
+    A newer schema (code rolled back) is allowed, with a warning.
+    """
+    async with engine.connect() as conn:
+        version = await current_version(conn)
+    if version < LATEST_VERSION:
+        raise SchemaVersionError(
+            f"Database schema is at version {version}, this build needs {LATEST_VERSION}. Run `migrate` first."
+        )
+    if version > LATEST_VERSION:
+        logger.warning("Database schema version %s is newer than this build (%s)", version, LATEST_VERSION)
+    return version
+
+
+async def status(engine: AsyncEngine = async_engine):
+    async with engine.connect() as conn:
+        version = await current_version(conn)
+    print(f"current version: {version}")
+    print(f"latest version:  {LATEST_VERSION}")
+    for migration in MIGRATIONS:
+        if migration.version > version:
+            print(f"  pending {migration.version}: {migration.description}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply database schema migrations.")
+    parser.add_argument("--status", action="store_true", help="show the schema version without migrating")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    async def run():
+        try:
+            if args.status:
+                await status()
+            else:
+                print(f"schema at version {await migrate()}")
+        finally:
+            await async_engine.dispose()
+
+    try:
+        asyncio.run(run())
+    except MigrationError as e:
+        sys.exit(f"migration failed: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,38 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field, Column, String
+import datetime as dt
 from datetime import date, time
 from pydantic import BaseModel
-from sqlalchemy import Boolean
+from sqlalchemy import Boolean, Index
 from uuid import UUID, uuid4
 
 class Booking(SQLModel, table=True):
     __tablename__ = "bookings"
-    
+    # Availability reads (date, time, duration_minutes) by date range: served by an index-only scan
+    __table_args__ = (
+        Index("ix_bookings_date_time", "date", "time", postgresql_include=["duration_minutes"]),
+    )
+
     id: UUID = Field(default_factory=uuid4, primary_key=True, index=True, nullable=False)
     service: str = Field(sa_column=Column(String, nullable=False))
     category: Optional[str] = Field(default=None, sa_column=Column(String))
     date: date
     time: time
+    duration_minutes: int = Field(default=60, nullable=False)
     # date: dt.date = Field(sa_column=Column(Date, nullable=False))
     # time: dt.time = Field(sa_column=Column(Time, nullable=False))
     client_name: str = Field(sa_column=Column(String, nullable=False))
     reference: Optional[str] = Field(default=None, sa_column=Column(String, unique=True, index=True))
 
 
+class BookingCounter(SQLModel, table=True):
+    """Last reference suffix handed out per booking date."""
+    __tablename__ = "booking_counters"
+
+    date: dt.date = Field(primary_key=True)
+    last_value: int = Field(default=0, nullable=False)
+
+
 class BookingCreate(BaseModel):
     service: str
     category: str | None = None
@@ -1,4 +1,4 @@
-from sqlmodel import SQLModel, Field, Column
+from sqlmodel import SQLModel, Field, Column, Text
 from sqlalchemy.dialects.postgresql import JSONB
 from typing import Dict, Any
 
@@ -7,3 +7,21 @@ class SessionHistory(SQLModel, table=True):
 
     session_id: str = Field(primary_key=True, index=True)
     history: Dict[str, Any] = Field(..., sa_column=Column(JSONB, nullable=False))
+
+
+class SessionItem(SQLModel, table=True):
+    """One agent history item; a session's history is its items ordered by seq."""
+    __tablename__ = "session_items"
+
+    session_id: str = Field(primary_key=True)
+    seq: int = Field(primary_key=True)
+    item: Dict[str, Any] = Field(..., sa_column=Column(JSONB, nullable=False))
+
+
+class SessionSummary(SQLModel, table=True):
+    """Compacted summary of a session's items up to and including upto_seq."""
+    __tablename__ = "session_summaries"
+
+    session_id: str = Field(primary_key=True)
+    upto_seq: int = Field(nullable=False)
+    summary: str = Field(sa_column=Column(Text, nullable=False))
@@ -1,50 +1,222 @@
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.future import select
-from .models.session_models import SessionHistory
+from .cache import TTLCache
+from .database import AsyncSessionLocal
+from .models.session_models import SessionItem, SessionSummary
+from .settings import settings
+
+SUMMARY_HEADER = "Summary of the earlier conversation with this client:"
+
+# session_id -> (summary, base_seq, live items) as of the last load/save in this worker
+session_cache = TTLCache(
+    maxsize=settings.SESSION_CACHE_SIZE,
+    ttl=settings.SESSION_CACHE_TTL_SECONDS,
+)
+
+
+def item_text(item: Dict[str, Any]) -> str:
+    """
+    Returns the plain text of a user/assistant message item, or '' for tool
+    calls, tool outputs and anything else without readable content.
+    """
+    content = item.get("content")
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict)).strip()
+    return ""
+
+
+def summarize_items(previous: Optional[str], items: List[Dict[str, Any]]) -> str:
+    """
+    Folds items into a running extractive summary without another model call.
+    The most recent lines are kept when it exceeds HISTORY_SUMMARY_MAX_CHARS.
+    """
+    lines = previous.splitlines()[1:] if previous else []
+    for item in items:
+        role = item.get("role")
+        text = " ".join(item_text(item).split())
+        if role not in ("user", "assistant") or not text:
+            continue
+        speaker = "Client" if role == "user" else "Aria"
+        lines.append(f"- {speaker}: {text[:200]}")
+
+    while lines and sum(len(line) + 1 for line in lines) > settings.HISTORY_SUMMARY_MAX_CHARS:
+        lines.pop(0)
+    return "\n".join([SUMMARY_HEADER, *lines])
+
+
+def start_of_turn(items: List[Dict[str, Any]], index: int) -> int:
+    """
+    Moves index forward to the next user message so a window never starts
+    with an orphaned tool output or assistant reply.
+    """
+    while index < len(items) and items[index].get("role") != "user":
+        index += 1
+    return index
+
+
+def latest_turn(items: List[Dict[str, Any]]) -> int:
+    """Index of the last user message, or len(items) if there is none."""
+    for index in range(len(items) - 1, -1, -1):
+        if items[index].get("role") == "user":
+            return index
+    return len(items)
+
 
 class PostgresSessionStore:
     """
     A session store that uses a PostgreSQL database to persist agent session history.
+    History is append-only: each item is its own session_items row keyed by
+    (session_id, seq), so a save only writes the items added since the last one.
+    Once more than HISTORY_COMPACT_THRESHOLD items are live, the oldest are folded
+    into a session_summaries row; their session_items rows stay for audit.
+    Loaded and saved sessions are kept in session_cache (write-through).
+    Each load and save runs in its own short DB session from `session_factory`,
+    so no connection is held while the agent is running in between.
     """
-    def __init__(self, session_id: str, db: AsyncSession):
+    def __init__(self, session_id: str, session_factory: sessionmaker = AsyncSessionLocal):
         self.session_id = session_id
-        self.db = db
+        self.session_factory = session_factory
+        # Live (not yet summarised) items; history[0] has seq == base_seq
         self.history: List[Dict[str, Any]] = []
+        self.base_seq = 0
+        # Number of items in self.history that already exist in the database
+        self.persisted = 0
+        self.summary: Optional[str] = None
+
+    @property
+    def is_new(self) -> bool:
+        """True when the session has no stored or pending conversation yet."""
+        return not self.history and not self.summary and self.base_seq == 0
 
     async def load_or_create(self):
         """
-        Loads the session history from the database. If no session exists,
-        it creates a new one and saves it.
+        Loads the session from session_cache or the database. With
+        SESSION_CACHE_VERIFY, a cached copy is only used if no other worker has
+        appended to the session since.
         """
-        stmt = select(SessionHistory).where(SessionHistory.session_id == self.session_id)
-        result = await self.db.execute(stmt)
-        session = result.scalar_one_or_none()
+        cached = session_cache.get(self.session_id)
+        if cached is not None:
+            summary, base_seq, history = cached
+            if not settings.SESSION_CACHE_VERIFY or await self.stored_version() == base_seq + len(history):
+                self.summary = summary
+                self.base_seq = base_seq
+                self.history = list(history)
+                self.persisted = len(self.history)
+                return
 
-        if session:
-            self.history = session.history
-        else:
-            self.history = []
-            new_session = SessionHistory(session_id=self.session_id, history=self.history)
-            self.db.add(new_session)
-            await self.db.commit()
+        await self.load()
+        self.remember()
+
+    async def stored_version(self) -> int:
+        """Returns the next seq to be written for this session (0 when empty)."""
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(func.max(SessionItem.seq)).where(SessionItem.session_id == self.session_id)
+            )
+            last_seq = result.scalar_one_or_none()
+        return 0 if last_seq is None else last_seq + 1
+
+    def remember(self):
+        """Writes the current state through to session_cache."""
+        session_cache.set(self.session_id, (self.summary, self.base_seq, list(self.history)))
+
+    async def load(self):
+        """
+        Loads the stored summary and the live items after it. A new session
+        has no rows yet; its first items are written by save().
+        """
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(SessionSummary).where(SessionSummary.session_id == self.session_id)
+            )
+            summary = result.scalar_one_or_none()
+            after_seq = summary.upto_seq if summary else -1
+            self.summary = summary.summary if summary else None
+
+            # Compaction keeps this to about HISTORY_COMPACT_THRESHOLD items; a longer
+            # (e.g. migrated) history is loaded whole so its next save can summarise it
+            stmt = (
+                select(SessionItem.seq, SessionItem.item)
+                .where(SessionItem.session_id == self.session_id, SessionItem.seq > after_seq)
+                .order_by(SessionItem.seq)
+            )
+            rows = (await db.execute(stmt)).all()
+
+        self.history = [item for _, item in rows]
+        self.base_seq = rows[0][0] if rows else after_seq + 1
+        self.persisted = len(self.history)
 
     async def save(self):
         """
-        Saves the current session history back to the database.
+        Appends the items added since the last load/save with a single INSERT,
+        compacting older items into the summary when the threshold is passed.
+        If another turn of this session saved first, the stored history is
+        reloaded and the new items are appended after it.
         """
-        stmt = select(SessionHistory).where(SessionHistory.session_id == self.session_id)
-        result = await self.db.execute(stmt)
-        session = result.scalar_one_or_none()
+        pending = self.history[self.persisted:]
+        if not pending:
+            return
 
-        if session:
-            session.history = self.history
-            await self.db.commit()
-        else:
-            new_session = SessionHistory(session_id=self.session_id, history=self.history)
-            self.db.add(new_session)
-            await self.db.commit()
+        try:
+            try:
+                await self.append_pending()
+            except IntegrityError:
+                # (session_id, seq) already taken: continue from what was stored
+                await self.load()
+                self.history.extend(pending)
+                await self.append_pending()
+        except Exception:
+            session_cache.pop(self.session_id)
+            raise
+        self.remember()
+
+    async def append_pending(self):
+        """Inserts history[persisted:] with the seqs that follow base_seq."""
+        stmt = insert(SessionItem).values([
+            {"session_id": self.session_id, "seq": self.base_seq + index, "item": item}
+            for index, item in enumerate(self.history[self.persisted:], start=self.persisted)
+        ])
+        async with self.session_factory() as db:
+            await db.execute(stmt)
+            self.persisted = len(self.history)
+
+            if len(self.history) > settings.HISTORY_COMPACT_THRESHOLD:
+                await self.compact(db)
+
+            await db.commit()
+
+    async def compact(self, db: AsyncSession):
+        """
+        Folds every live item older than the last HISTORY_WINDOW_ITEMS (cut at a
+        turn boundary) into the stored summary.
+        """
+        cut = start_of_turn(self.history, max(len(self.history) - settings.HISTORY_WINDOW_ITEMS, 0))
+        if cut == 0 or cut >= len(self.history):
+            return
+
+        self.summary = summarize_items(self.summary, self.history[:cut])
+        upto_seq = self.base_seq + cut - 1
+
+        stmt = insert(SessionSummary).values(
+            session_id=self.session_id, upto_seq=upto_seq, summary=self.summary
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SessionSummary.session_id],
+            set_={"upto_seq": stmt.excluded.upto_seq, "summary": stmt.excluded.summary},
+        )
+        await db.execute(stmt)
+
+        self.history = self.history[cut:]
+        self.base_seq = upto_seq + 1
+        self.persisted -= cut
 
     def add_message(self, message: Dict[str, Any]):
         """
@@ -59,11 +231,42 @@ class PostgresSessionStore:
         """
         return self.history
 
-    async def get_items(self, *args, **kwargs) -> List[Dict[str, Any]]:
+    async def get_items(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
-        Retrieves the list of messages.
+        Retrieves the most recent messages for the Runner: at most `limit`
+        (default HISTORY_WINDOW_ITEMS) items within HISTORY_TOKEN_BUDGET,
+        starting at a user turn. If that leaves no whole turn, the latest user
+        turn is returned anyway. Everything before the window is folded into
+        the summary sent ahead of it, so no part of the conversation is left out.
         """
-        return self.history
+        limit = settings.HISTORY_WINDOW_ITEMS if limit is None else limit
+        offset = max(len(self.history) - limit, 0)
+        window = self.history[offset:]
+
+        budget = settings.HISTORY_TOKEN_BUDGET * 4
+        used = 0
+        start = len(window)
+        while start > 0:
+            size = len(json.dumps(window[start - 1], default=str))
+            if used + size > budget:
+                break
+            used += size
+            start -= 1
+
+        start = start_of_turn(window, start)
+        if start < len(window):
+            first = offset + start
+        elif limit > 0:
+            # Budget or window too small for a whole turn; never drop all context
+            first = latest_turn(self.history)
+        else:
+            first = len(self.history)
+
+        items = self.history[first:]
+        summary = summarize_items(self.summary, self.history[:first]) if first else self.summary
+        if summary and summary != SUMMARY_HEADER:
+            items = [{"role": "system", "content": summary}, *items]
+        return items
 
     async def add_items(self, items: List[Dict[str, Any]]):
         """
@@ -1,3 +1,4 @@
+from typing import Literal
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -6,10 +7,10 @@ load_dotenv()
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
-    # Supabase Credentials
-    NEXT_PUBLIC_SUPABASE_URL: str
-    NEXT_PUBLIC_SUPABASE_ANON_KEY: str
-    SUPABASE_SECRET_KEY: str # This is crucial for server-side
+    # Supabase Credentials (only needed by get_supabase_public/get_supabase_admin)
+    NEXT_PUBLIC_SUPABASE_URL: str | None = None
+    NEXT_PUBLIC_SUPABASE_ANON_KEY: str | None = None
+    SUPABASE_SECRET_KEY: str | None = None # This is crucial for server-side
     DIRECT_URL: str
 
     # LLM / API credentials
@@ -19,6 +20,35 @@ class Settings(BaseSettings):
     # Secret for signing / security
     API_SECRET_KEY: str
 
+    # Database engine: DB_PROFILE picks defaults, any DB_* value set here overrides them
+    DB_PROFILE: Literal["dev", "prod"] = "dev"
+    DB_ECHO: bool | None = None                 # log every SQL statement
+    DB_POOL_SIZE: int | None = None             # connections kept open per worker
+    DB_MAX_OVERFLOW: int | None = None          # extra connections under burst
+    DB_POOL_TIMEOUT: float | None = None        # seconds to wait for a free connection
+    DB_STATEMENT_TIMEOUT_MS: int | None = None  # server-side statement_timeout (0 = none)
+    DB_APPLICATION_NAME: str = "asuna-backend"  # shown in pg_stat_activity
+
+    # Booking availability
+    SLOT_GRANULARITY_MINUTES: int = 30
+    AVAILABILITY_CACHE_TTL_SECONDS: int = 30   # bounds staleness from other workers' bookings
+    AVAILABILITY_WARM_DAYS: int = 0            # days preloaded at startup (0 = off)
+
+    # Agent session history
+    HISTORY_WINDOW_ITEMS: int = 40        # items handed to the Runner per turn
+    HISTORY_TOKEN_BUDGET: int = 4000      # approx. tokens (4 chars each) for that window
+    HISTORY_COMPACT_THRESHOLD: int = 80   # live items kept before older ones are summarised
+    HISTORY_SUMMARY_MAX_CHARS: int = 2000
+    SESSION_CACHE_SIZE: int = 1024        # sessions cached per worker (0 disables)
+    SESSION_CACHE_TTL_SECONDS: int = 300
+    SESSION_CACHE_VERIFY: bool = False    # check the stored version before using a cached session
+                                          # (always on under gunicorn with more than one worker)
+
+    # Cached answers to opening questions (keyed by the prompt's content words)
+    RESPONSE_CACHE_SIZE: int = 512              # answers cached per worker (0 disables)
+    RESPONSE_CACHE_TTL_SECONDS: int = 3600
+    RESPONSE_CACHE_NEAR_MATCHES: bool = True    # share answers between prompts with the same content words
+
     # Frontend/backend URLs
     BACKEND_URL: str | None = None
 
@@ -1,41 +1,92 @@
-from fastapi_backend.salon_data import services
-from datetime import datetime, timedelta
+from fastapi_backend.catalogue import catalogue, parse_duration
+from typing import Iterable, List, Tuple
 
 
 # --------- UTILITIES ---------
-def parse_duration(duration_str: str) -> int:
-    """Convert '2 hrs 15 mins' → total minutes."""
-    hours = 0
-    minutes = 0
-    if "hr" in duration_str:
-        import re
-        match = re.search(r"(\d+)\s*hr", duration_str)
-        if match:
-            hours = int(match.group(1))
-    if "min" in duration_str:
-        import re
-        match = re.search(r"(\d+)\s*min", duration_str)
-        if match:
-            minutes = int(match.group(1))
-    return hours * 60 + minutes
+def get_service_duration(service_name: str) -> int:
+    """Look up service duration (minutes) from the precompiled catalogue."""
+    return catalogue.duration_minutes(service_name)
 
 
-def get_service_duration(service_name: str) -> int:
-    """Look up service duration from salon_data.py."""
-    for s in services:
-        if s["name"].lower() == service_name.lower():
-            return parse_duration(s["description"])
-    return 60
+def to_minutes(hhmm: str) -> int:
+    """Convert 'HH:MM' → minutes since midnight."""
+    hours, minutes = hhmm.split(":")
+    return int(hours) * 60 + int(minutes)
 
 
-def generate_time_slots(start: str, end: str, service_minutes: int):
-    """Generate available start times between open/close respecting service duration."""
+def format_minutes(total: int) -> str:
+    """Convert minutes since midnight → 'HH:MM'."""
+    return f"{total // 60:02d}:{total % 60:02d}"
+
+
+def merge_intervals(intervals: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Sort [start, end) minute intervals and merge the ones that overlap or touch."""
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def free_slots(
+    start: str,
+    end: str,
+    service_minutes: int,
+    busy: Iterable[Tuple[int, int]] = (),
+    step: int | None = None,
+) -> List[str]:
+    """
+    Start times on a `step`-minute grid from opening time where a
+    `service_minutes` appointment fits before closing without overlapping
+    any busy [start, end) interval. One sweep over the merged intervals.
+    """
+    step = step or service_minutes
+    opening = to_minutes(start)
+    closing = to_minutes(end)
+    intervals = merge_intervals(busy)
+
     slots = []
-    current = datetime.strptime(start, "%H:%M")
-    closing = datetime.strptime(end, "%H:%M")
+    current = opening
+    i = 0
+    while current + service_minutes <= closing:
+        # Skip intervals that finish before this candidate starts
+        while i < len(intervals) and intervals[i][1] <= current:
+            i += 1
 
-    while current + timedelta(minutes=service_minutes) <= closing:
-        slots.append(current.strftime("%H:%M"))
-        current += timedelta(minutes=service_minutes)
+        if i < len(intervals) and intervals[i][0] < current + service_minutes:
+            # Overlap: jump to the first grid point at or after the interval's end
+            blocked_until = intervals[i][1]
+            current += -(-(blocked_until - current) // step) * step
+            continue
+
+        slots.append(format_minutes(current))
+        current += step
 
     return slots
+
+
+def generate_time_slots(start: str, end: str, service_minutes: int, step: int | None = None):
+    """Generate available start times between open/close respecting service duration."""
+    return free_slots(start, end, service_minutes, step=step)
+
+
+def slot_bitmap(free: Iterable[str], start: str, end: str, service_minutes: int, step: int) -> Tuple[str, int]:
+    """
+    Encode a day's free slots as a hex bitmap over every grid start that fits
+    before closing: the first slot is the most significant bit. Returns
+    (hex string padded to whole nibbles, number of grid slots).
+    """
+    opening = to_minutes(start)
+    count = max((to_minutes(end) - service_minutes - opening) // step + 1, 0)
+    if count == 0:
+        return "", 0
+
+    bits = 0
+    for slot in free:
+        index = (to_minutes(slot) - opening) // step
+        if 0 <= index < count:
+            bits |= 1 << (count - 1 - index)
+    return format(bits, f"0{-(-count // 4)}x"), count
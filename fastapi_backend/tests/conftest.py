@@ -0,0 +1,10 @@
+import os
+
+# Settings are read at import; unit tests never reach the database or the model
+for name, value in {
+    "DIRECT_URL": "postgresql://test@localhost/test",
+    "MODEL_NAME": "test-model",
+    "API_KEY": "test",
+    "API_SECRET_KEY": "test",
+}.items():
+    os.environ.setdefault(name, value)
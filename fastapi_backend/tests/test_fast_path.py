@@ -0,0 +1,39 @@
+from fastapi_backend.agents.fast_path import answer_directly
+
+
+def test_price_question_is_answered():
+    assert "£70.00" in answer_directly("How much is the head spa?")
+
+
+def test_cancellation_question_goes_to_the_llm():
+    assert answer_directly("Can I pay a fee to cancel my head spa?") is None
+
+
+def test_policy_questions_go_to_the_llm():
+    for question in (
+        "Is the head spa deposit refundable?",
+        "How much does it cost to reschedule a head spa?",
+        "What's the cancellation charge for a head spa?",
+    ):
+        assert answer_directly(question) is None, question
+
+
+def test_misspelt_service_is_found():
+    assert "**Balyage**" in answer_directly("how much is balayage")
+
+
+def test_duration_question_is_answered():
+    assert "1 hr 50 mins" in answer_directly("How long does the head spa take?")
+
+
+def test_longer_name_wins_over_the_name_inside_it():
+    assert "**Hollywood Bikini Line Wax**" in answer_directly("price of the hollywood bikini line wax")
+
+
+def test_several_services_go_to_the_llm():
+    assert answer_directly("I don't want head spa, how much is balayage") is None
+    assert answer_directly("what's the price of balayage and head spa") is None
+
+
+def test_take_alone_is_not_a_duration_question():
+    assert answer_directly("Do you take card payments for the head spa?") is None
@@ -0,0 +1,37 @@
+import pytest
+
+from fastapi_backend.agents.response_cache import ResponseCache
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache(maxsize=16, ttl=60, near_matches=True)
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("How long does head spa take?", "how long does the head spa take"),
+    ("Hi, how much is the herbal facial please?", "how much is herbal facial"),
+    ("Can men book the Hollywood bikini line wax?", "can men book the hollywood bikini line wax"),
+])
+def test_paraphrase_hits(cache, cached, asked):
+    cache.set(cached, "ANSWER")
+    assert cache.get(asked) == "ANSWER"
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("can men book the hollywood bikini line wax", "can women book the hollywood bikini line wax"),
+    ("Is the head spa safe if I am pregnant?", "Is the head spa safe if I am not pregnant?"),
+    ("Can I book the head spa for my 15 year old?", "Can I book the head spa for my 16 year old?"),
+    ("Is a facial ok if I don't have sensitive skin", "Is a facial ok if I have sensitive skin"),
+    ("how much is the head spa", "how much is the herbal facial"),
+])
+def test_different_questions_miss(cache, cached, asked):
+    cache.set(cached, "ANSWER")
+    assert cache.get(asked) is None
+
+
+def test_exact_only():
+    exact = ResponseCache(maxsize=16, ttl=60, near_matches=False)
+    exact.set("How long does head spa take?", "ANSWER")
+    assert exact.get("how long does head spa take") == "ANSWER"
+    assert exact.get("how long does the head spa take") is None
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from fastapi_backend.session_store import SUMMARY_HEADER, PostgresSessionStore, summarize_items
+from fastapi_backend.settings import settings
+
+
+def turn(n, tool_output=None):
+    items = [{"role": "user", "content": f"q{n}"}]
+    if tool_output is not None:
+        items.append({"type": "function_call_output", "call_id": f"c{n}", "output": tool_output})
+    items.append({"role": "assistant", "content": f"a{n}"})
+    return items
+
+
+def store_with(items, summary=None):
+    store = PostgresSessionStore("test")
+    store.history = list(items)
+    store.persisted = len(items)
+    store.summary = summary
+    return store
+
+
+def contents(items):
+    return [item.get("content") if "role" in item else item["type"] for item in items]
+
+
+def get_items(store, limit=None):
+    return asyncio.run(store.get_items(limit))
+
+
+@pytest.fixture(autouse=True)
+def history_settings(monkeypatch):
+    monkeypatch.setattr(settings, "HISTORY_WINDOW_ITEMS", 6)
+    monkeypatch.setattr(settings, "HISTORY_TOKEN_BUDGET", 4000)
+    monkeypatch.setattr(settings, "HISTORY_COMPACT_THRESHOLD", 10)
+
+
+def test_short_history_is_sent_whole():
+    store = store_with(turn(0) + turn(1))
+    assert contents(get_items(store)) == ["q0", "a0", "q1", "a1"]
+
+
+def test_window_starts_at_a_user_turn_and_older_items_are_summarised():
+    # 9 items; the last 6 start mid-turn (at q1's tool output), so the window starts at q2
+    store = store_with(turn(0) + turn(1, "tool") + turn(2) + turn(3))
+    items = get_items(store)
+    assert contents(items[1:]) == ["q2", "a2", "q3", "a3"]
+    assert items[0]["role"] == "system"
+    assert items[0]["content"] == summarize_items(None, store.history[:5])
+    assert "- Client: q1" in items[0]["content"] and "- Aria: a1" in items[0]["content"]
+
+
+def test_summary_covers_stored_summary_and_skipped_items():
+    store = store_with(turn(5) + turn(6) + turn(7) + turn(8), summary=f"{SUMMARY_HEADER}\n- Client: q4")
+    summary = get_items(store)[0]["content"]
+    assert summary.splitlines() == [SUMMARY_HEADER, "- Client: q4", "- Client: q5", "- Aria: a5"]
+
+
+def test_token_budget_trims_to_a_turn_boundary(monkeypatch):
+    monkeypatch.setattr(settings, "HISTORY_TOKEN_BUDGET", 100)   # 400 chars
+    store = store_with(turn(0, "x" * 300) + turn(1))
+    assert contents(get_items(store)[1:]) == ["q1", "a1"]
+
+
+def test_latest_turn_is_kept_when_nothing_fits(monkeypatch):
+    monkeypatch.setattr(settings, "HISTORY_TOKEN_BUDGET", 100)
+    store = store_with(turn(0) + turn(1, "x" * 1000))
+    items = get_items(store)
+    assert contents(items[1:]) == ["q1", "function_call_output", "a1"]
+    assert "- Client: q0" in items[0]["content"]
+
+
+def test_limit_zero_sends_only_the_summary():
+    store = store_with(turn(0))
+    assert contents(get_items(store, 0)) == [f"{SUMMARY_HEADER}\n- Client: q0\n- Aria: a0"]
+    assert get_items(store_with([]), 0) == []
+
+
+def test_tool_items_alone_add_no_empty_summary():
+    store = store_with([{"type": "function_call_output", "output": "x"}] + turn(1) + turn(2) + turn(3))
+    assert contents(get_items(store)) == ["q1", "a1", "q2", "a2", "q3", "a3"]
+
+
+class RecordingDB:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+
+
+def test_compact_folds_everything_before_the_window():
+    items = [item for n in range(6) for item in turn(n)]   # 12 items
+    store = store_with(items)
+    store.base_seq = 20
+    expected_items = get_items(store)
+    db = RecordingDB()
+
+    asyncio.run(store.compact(db))
+
+    assert contents(store.history) == ["q3", "a3", "q4", "a4", "q5", "a5"]
+    assert store.base_seq == 26
+    assert store.persisted == 6
+    assert store.summary == summarize_items(None, items[:6])
+    params = db.statements[0].compile().params
+    assert params["upto_seq"] == 25 and params["summary"] == store.summary
+    # Compacting doesn't change what the model is sent
+    assert get_items(store) == expected_items
+
+
+def test_compact_leaves_a_short_history_alone():
+    store = store_with(turn(0) + turn(1))
+    db = RecordingDB()
+    asyncio.run(store.compact(db))
+    assert db.statements == [] and store.summary is None and len(store.history) == 4
@@ -0,0 +1,39 @@
+from fastapi_backend.utils import free_slots, merge_intervals, slot_bitmap, to_minutes
+
+
+def test_long_booking_blocks_every_start_it_overlaps():
+    # 2h35 booking, 10:00-12:35
+    busy = [(to_minutes("10:00"), to_minutes("12:35"))]
+    slots = free_slots("09:00", "17:00", 60, busy=busy, step=15)
+
+    assert slots[:2] == ["09:00", "12:45"]
+    assert "12:30" not in slots
+    assert slots[-1] == "16:00"
+
+
+def test_slots_after_a_busy_interval_stay_on_the_grid():
+    busy = [(to_minutes("10:10"), to_minutes("10:50"))]
+    slots = free_slots("09:00", "12:00", 30, busy=busy, step=30)
+
+    assert slots == ["09:00", "09:30", "11:00", "11:30"]
+
+
+def test_touching_and_overlapping_intervals_merge():
+    assert merge_intervals([(90, 120), (60, 90), (15, 30), (10, 20), (200, 210)]) == [
+        (10, 30),
+        (60, 120),
+        (200, 210),
+    ]
+
+
+def test_slot_bitmap_puts_the_first_slot_in_the_most_significant_bit():
+    # 16 half-hour starts from 09:00; a booking until 12:00 takes the first 6
+    free = free_slots("09:00", "17:00", 30, busy=[(to_minutes("09:00"), to_minutes("12:00"))], step=30)
+
+    assert slot_bitmap(free, "09:00", "17:00", 30, 30) == ("03ff", 16)
+
+
+def test_slot_bitmap_pads_to_whole_nibbles():
+    # 5 starts -> two hex digits; only the last is free
+    assert slot_bitmap(["11:00"], "09:00", "11:30", 30, 30) == ("01", 5)
+    assert slot_bitmap([], "09:00", "09:20", 30, 30) == ("", 0)